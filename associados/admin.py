@@ -1,6 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Pescador, Endereco, Documento, Mensalidade, AssociacaoConfig, CaixaLancamento
+from .models import Arquivo, Pescador, Endereco, Documento, Mensalidade, AssociacaoConfig, CaixaLancamento, CaixaSaldoMensal, PdfJob
 
 
 class EnderecoInline(admin.StackedInline):
@@ -38,3 +39,24 @@ class CaixaLancamentoAdmin(admin.ModelAdmin):
     list_filter = ("tipo", "categoria")
     search_fields = ("descricao", "categoria")
 
+    def delete_queryset(self, request, queryset):
+        # Exclusão em massa não passa por CaixaLancamento.delete(): recalcula os meses afetados
+        meses = {d.replace(day=1) for d in queryset.values_list("data", flat=True)}
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            CaixaSaldoMensal.recalcular(meses)
+
+
+
+@admin.register(PdfJob)
+class PdfJobAdmin(admin.ModelAdmin):
+    list_display = ("tipo", "objeto_id", "status", "tentativas", "criado_em", "concluido_em")
+    list_filter = ("tipo", "status")
+    readonly_fields = ("chave", "erro")
+
+
+@admin.register(Arquivo)
+class ArquivoAdmin(admin.ModelAdmin):
+    list_display = ("sha256", "tamanho", "referencias", "criado_em")
+    readonly_fields = ("sha256", "arquivo", "tamanho", "referencias")
+    search_fields = ("sha256",)
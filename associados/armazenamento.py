@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from . import imagens
+from .models import Arquivo
+
+# Armazenamento por conteúdo dos documentos: cada arquivo é gravado uma única vez em
+# MEDIA_ROOT/blobs/ab/cd/<sha256>.<ext>, e os Documento apontam para o mesmo Arquivo.
+# Arquivo.referencias conta os documentos; ao chegar a zero o arquivo é apagado do disco.
+BLOB_DIR = "blobs"
+CHUNK = 64 * 1024
+
+
+def nome_blob(sha256, ext):
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def _extensao(nome):
+    ext = os.path.splitext(nome or "")[1].lower()
+    return ext if len(ext) <= 10 else ""
+
+
+def armazenar(arquivo, nome=None):
+    """Grava o conteúdo de `arquivo` (UploadedFile ou objeto com read) e retorna o Arquivo,
+    já com uma referência a mais.
+
+    O SHA-256 é calculado enquanto o upload é copiado para um temporário no mesmo disco;
+    se o conteúdo já existe, o temporário é descartado.
+    """
+    pasta_tmp = os.path.join(settings.MEDIA_ROOT, BLOB_DIR, "tmp")
+    os.makedirs(pasta_tmp, exist_ok=True)
+    h = hashlib.sha256()
+    tamanho = 0
+    fd, tmp = tempfile.mkstemp(dir=pasta_tmp)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if hasattr(arquivo, "chunks"):
+                partes = arquivo.chunks(CHUNK)
+            else:
+                partes = iter(lambda: arquivo.read(CHUNK), b"")
+            for parte in partes:
+                h.update(parte)
+                tamanho += len(parte)
+                out.write(parte)
+        sha = h.hexdigest()
+        with transaction.atomic():
+            blob, criado = Arquivo.objects.select_for_update().get_or_create(
+                sha256=sha,
+                defaults={"arquivo": nome_blob(sha, _extensao(nome or getattr(arquivo, "name", ""))), "tamanho": tamanho},
+            )
+            destino = os.path.join(settings.MEDIA_ROOT, blob.arquivo.name)
+            if not os.path.exists(destino):
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                os.replace(tmp, destino)
+            if criado and imagens.gerar_derivados(blob):
+                Arquivo.objects.filter(pk=blob.pk).update(imagem=True)
+            Arquivo.objects.filter(pk=blob.pk).update(referencias=F("referencias") + 1)
+        blob.refresh_from_db(fields=["referencias", "imagem"])
+        return blob
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def liberar(blob_id):
+    """Remove uma referência; sem referências, apaga o registro e (após o commit) o arquivo."""
+    with transaction.atomic():
+        Arquivo.objects.filter(pk=blob_id, referencias__gt=0).update(referencias=F("referencias") - 1)
+        blob = Arquivo.objects.select_for_update().filter(pk=blob_id, referencias=0).first()
+        if blob is None:
+            return
+        sha = blob.sha256
+        paths = [blob.arquivo.name]
+        if blob.imagem:
+            paths += [imagens.nome_derivado(blob.arquivo.name, tipo) for tipo in imagens.DERIVADOS]
+        blob.delete()
+
+    def apagar():
+        if Arquivo.objects.filter(sha256=sha).exists():
+            return  # mesmo conteúdo enviado de novo enquanto isso
+        for path in paths:
+            try:
+                os.remove(os.path.join(settings.MEDIA_ROOT, path))
+            except OSError:
+                pass
+
+    transaction.on_commit(apagar)
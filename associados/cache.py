@@ -0,0 +1,49 @@
+import secrets
+import threading
+
+from django.core.cache import caches
+
+# Cache compartilhado entre os workers do gunicorn (ver CACHES["shared"] em settings).
+# Cada worker mantém sua cópia local da AssociacaoConfig e só relê do banco
+# quando a versão publicada no cache compartilhado muda.
+CONFIG_VERSION_KEY = "associacao_config:versao"
+
+_lock = threading.RLock()
+_local = {"versao": None, "obj": None}
+
+
+def _shared():
+    return caches["shared"]
+
+
+def config_versao():
+    """Versão atual da configuração; cria uma nova se o cache compartilhado estiver vazio."""
+    versao = _shared().get(CONFIG_VERSION_KEY)
+    if versao is None:
+        _shared().add(CONFIG_VERSION_KEY, secrets.token_hex(8), timeout=None)
+        versao = _shared().get(CONFIG_VERSION_KEY)
+    return versao
+
+
+def get_config():
+    """AssociacaoConfig em cache local por processo. O objeto retornado é compartilhado: não altere."""
+    from .models import AssociacaoConfig
+
+    versao = config_versao()
+    obj = _local["obj"]
+    if obj is not None and _local["versao"] == versao:
+        return obj
+    # RLock: o get_or_create de get_solo() pode disparar post_save -> invalidar_config no mesmo thread
+    with _lock:
+        if _local["obj"] is None or _local["versao"] != versao:
+            _local["obj"] = AssociacaoConfig.get_solo()
+            _local["versao"] = versao
+        return _local["obj"]
+
+
+def invalidar_config():
+    """Publica uma nova versão: todos os workers relêem a configuração no próximo acesso."""
+    _shared().set(CONFIG_VERSION_KEY, secrets.token_hex(8), timeout=None)
+    with _lock:
+        _local["obj"] = None
+        _local["versao"] = None
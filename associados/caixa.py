@@ -0,0 +1,83 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import CaixaSaldoMensal
+
+PAGE_SIZE = 50
+ORDEM = ("-data", "-criado_em", "-pk")
+
+_DINHEIRO = DecimalField(max_digits=14, decimal_places=2)
+
+
+def encode_cursor(obj):
+    raw = json.dumps([obj.data.isoformat(), obj.criado_em.isoformat(), obj.pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data, criado_em, pk = json.loads(raw)
+        return date.fromisoformat(data), datetime.fromisoformat(criado_em), int(pk)
+    except Exception:
+        return None
+
+
+def _antes_de(pos):
+    data, criado_em, pk = pos
+    return (
+        Q(data__lt=data)
+        | Q(data=data, criado_em__lt=criado_em)
+        | Q(data=data, criado_em=criado_em, pk__lt=pk)
+    )
+
+
+def anotar_saldo(qs):
+    """Anota `saldo_linha`: saldo acumulado do Caixa logo após cada lançamento.
+
+    Saldo de abertura do mês (CaixaSaldoMensal) + soma em janela dos lançamentos do mesmo mês
+    até a linha, na ordem (data, criado_em, id). Só depende dos lançamentos anteriores do próprio mês,
+    então continua correto quando o filtro remove meses inteiros ou linhas posteriores à linha.
+    """
+    abertura = (
+        CaixaSaldoMensal.objects.filter(mes__lt=OuterRef("mes_lanc"))
+        .order_by("-mes")
+        .values("saldo_final")[:1]
+    )
+    assinado = Case(
+        When(tipo="despesa", then=-F("valor")),
+        default=F("valor"),
+        output_field=_DINHEIRO,
+    )
+    return qs.annotate(mes_lanc=TruncMonth("data")).annotate(
+        saldo_linha=Coalesce(Subquery(abertura, output_field=_DINHEIRO), Value(0), output_field=_DINHEIRO)
+        + Window(
+            Sum(assinado),
+            partition_by=[F("mes_lanc")],
+            order_by=[F("data").asc(), F("criado_em").asc(), F("pk").asc()],
+            output_field=_DINHEIRO,
+        )
+    )
+
+
+def extrato(qs, cursor=None, limite=PAGE_SIZE):
+    """Extrato paginado por keyset sobre (data, criado_em, id), do mais recente ao mais antigo.
+
+    Retorna (itens, próximo_cursor). A primeira consulta só lê as datas da página pelo índice;
+    a segunda limita a janela aos meses que a página cobre, então páginas profundas custam
+    o mesmo que a primeira.
+    """
+    pos = decode_cursor(cursor) if cursor else None
+    if pos:
+        qs = qs.filter(_antes_de(pos))
+    datas = list(qs.order_by(*ORDEM).values_list("data", flat=True)[: limite + 1])
+    if not datas:
+        return [], None
+    qs = qs.filter(data__gte=datas[-1].replace(day=1))
+    itens = list(anotar_saldo(qs).order_by(*ORDEM)[: limite + 1])
+    proximo = encode_cursor(itens[limite - 1]) if len(itens) > limite else None
+    return itens[:limite], proximo
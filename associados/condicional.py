@@ -0,0 +1,73 @@
+import hashlib
+import json
+from datetime import datetime, time
+from calendar import timegm
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# Validadores HTTP (ETag/Last-Modified) calculados só dos updated_at, sem renderizar nada.
+# PDFs e páginas trazem a data de emissão/ano corrente: o dia entra no ETag e o
+# Last-Modified nunca é anterior ao início do dia.
+VERSAO = 1  # mude quando o layout dos PDFs/páginas mudar
+
+
+class Validadores:
+    def __init__(self, partes, datas):
+        hoje = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        self.last_modified = max([d for d in datas if d] + [hoje])
+        raw = json.dumps([VERSAO, str(timezone.localdate())] + list(partes), default=str)
+        self.etag = '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+    def resposta_304(self, request):
+        """HttpResponseNotModified (ou 412) se o cliente já tem esta versão; senão None."""
+        return get_conditional_response(request, etag=self.etag, last_modified=timegm(self.last_modified.utctimetuple()))
+
+    def aplicar(self, response):
+        response["ETag"] = self.etag
+        response["Last-Modified"] = http_date(timegm(self.last_modified.utctimetuple()))
+        return response
+
+
+def _agregado(qs):
+    return qs.aggregate(ultimo=Max("updated_at"), total=Count("pk"))
+
+
+def recibo(mensalidade, config, base_url):
+    p = mensalidade.pescador
+    return Validadores(
+        ["recibo", mensalidade.pk, mensalidade.recibo_token, base_url, mensalidade.updated_at, p.updated_at, config.updated_at],
+        [mensalidade.updated_at, p.updated_at, config.updated_at],
+    )
+
+
+def dossie(pescador, config, ano):
+    docs = _agregado(pescador.documentos.all())
+    mens = _agregado(pescador.mensalidades.filter(competencia__year=ano))
+    return Validadores(
+        ["dossie", pescador.pk, ano, pescador.updated_at, config.updated_at, docs, mens],
+        [pescador.updated_at, config.updated_at, docs["ultimo"], mens["ultimo"]],
+    )
+
+
+def _csrf(request):
+    get_token(request)  # garante o segredo; o token devolvido é mascarado (muda a cada chamada)
+    return request.META.get("CSRF_COOKIE")
+
+
+def pagina_pescador(request, pescador, config):
+    """Validadores da página do pescador, ou None quando não é seguro responder 304
+    (mensagens pendentes para exibir)."""
+    if len(get_messages(request)):
+        return None
+    docs = _agregado(pescador.documentos.all())
+    mens = _agregado(pescador.mensalidades.all())
+    return Validadores(
+        # Usuário e token CSRF entram no ETag: a página contém formulários e o menu do usuário
+        ["pescador", request.user.pk, _csrf(request), pescador.pk, pescador.updated_at, config.updated_at, docs, mens],
+        [pescador.updated_at, config.updated_at, docs["ultimo"], mens["ultimo"]],
+    )
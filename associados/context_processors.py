@@ -2,5 +2,5 @@ from .models import AssociacaoConfig
 
 def app_config(request):
     return {
-        'app_config': AssociacaoConfig.get_solo()
+        'app_config': AssociacaoConfig.get_cached()
     }
@@ -0,0 +1,94 @@
+import csv
+from datetime import date
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+
+from . import relatorios
+from .models import CaixaLancamento, Mensalidade, Pescador
+
+# Exportações em CSV no formato do Excel em português (";" e vírgula decimal, UTF-8 com BOM).
+# As linhas saem de values_list().iterator(): sem instâncias de modelo e com memória constante,
+# e o gerador é consumido pelo StreamingHttpResponse à medida que o cliente/nginx lê.
+CHUNK_SIZE = 2000
+
+
+class _Eco:
+    """Pseudo-arquivo: csv.writer escreve aqui e recebemos a linha formatada de volta."""
+
+    def write(self, value):
+        return value
+
+
+def _celula(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, Decimal):
+        return f"{valor:.2f}".replace(".", ",")
+    if isinstance(valor, date):
+        return valor.strftime("%d/%m/%Y")
+    if isinstance(valor, bool):
+        return "Sim" if valor else "Não"
+    return valor
+
+
+def _linhas(cabecalho, linhas):
+    writer = csv.writer(_Eco(), delimiter=";")
+    bloco = ["\ufeff" + writer.writerow(cabecalho)]
+    for linha in linhas:
+        bloco.append(writer.writerow([_celula(v) for v in linha]))
+        # Envia em blocos: uma escrita no socket a cada ~500 linhas, não uma por linha
+        if len(bloco) >= 500:
+            yield "".join(bloco)
+            bloco = []
+    if bloco:
+        yield "".join(bloco)
+
+
+def resposta_csv(nome, cabecalho, linhas):
+    response = StreamingHttpResponse(_linhas(cabecalho, linhas), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{nome}"'
+    return response
+
+
+PESCADORES = [
+    ("Nome", "nome"), ("CPF", "cpf"), ("RGP", "rgp"), ("RG", "rg"), ("Órgão emissor", "rg_orgao_emissor"),
+    ("Nascimento", "data_nascimento"), ("Telefone", "telefone"), ("Associação", "data_associacao"),
+    ("Seguro defeso", "seguro_defeso_pedido"),
+    ("Logradouro", "endereco__logradouro"), ("Número", "endereco__numero"),
+    ("Complemento", "endereco__complemento"), ("Bairro", "endereco__bairro"),
+    ("Cidade", "endereco__cidade"), ("UF", "endereco__estado"), ("CEP", "endereco__cep"),
+]
+
+MENSALIDADES = [
+    ("Pescador", "pescador__nome"), ("CPF", "pescador__cpf"), ("Competência", "competencia"),
+    ("Valor", "valor"), ("Status", "status"), ("Data do pagamento", "data_pagamento"),
+    ("Forma de pagamento", "forma_pagamento"), ("Recibo", "recibo_numero"), ("Observação", "observacao"),
+]
+
+CAIXA = [
+    ("Data", "data"), ("Tipo", "tipo"), ("Categoria", "categoria"), ("Descrição", "descricao"),
+    ("Valor", "valor"),
+]
+
+
+def _exportar(qs, colunas):
+    campos = [campo for _, campo in colunas]
+    return [titulo for titulo, _ in colunas], qs.values_list(*campos).iterator(chunk_size=CHUNK_SIZE)
+
+
+def pescadores():
+    return _exportar(Pescador.objects.order_by("nome", "pk"), PESCADORES)
+
+
+def mensalidades(ano=None, mes=None, status=None):
+    """Mensalidades do período com os mesmos filtros de RelatoriosView (e status opcional)."""
+    qs = Mensalidade.objects.filter(relatorios.periodo_q("competencia", ano, mes))
+    if status:
+        qs = qs.filter(status=status)
+    return _exportar(qs.order_by("competencia", "pescador__nome", "pk"), MENSALIDADES)
+
+
+def caixa(ano=None, mes=None):
+    qs = CaixaLancamento.objects.filter(relatorios.periodo_q("data", ano, mes))
+    return _exportar(qs.order_by("data", "criado_em", "pk"), CAIXA)
@@ -98,3 +98,13 @@ class CaixaLancamentoForm(forms.ModelForm):
         widgets = {
             "data": forms.DateInput(attrs={"type": "date"}),
         }
+
+
+class ImportarPescadoresForm(forms.Form):
+    CODIFICACOES = [
+        ("utf-8-sig", "UTF-8"),
+        ("cp1252", "Windows (Excel antigo / Latin-1)"),
+    ]
+    arquivo = forms.FileField(label="Arquivo CSV", help_text="Colunas: Nome; CPF; RGP; Nascimento; e opcionalmente RG, Telefone, Associação e endereço.")
+    codificacao = forms.ChoiceField(label="Codificação", choices=CODIFICACOES, initial="utf-8-sig")
+    simular = forms.BooleanField(label="Apenas validar (não gravar)", required=False)
@@ -0,0 +1,77 @@
+import io
+import os
+
+from django.conf import settings
+
+# Fotos de documentos (celular, 8-12 MP) são normalizadas no upload: orientação EXIF aplicada,
+# reduzidas para um tamanho de arquivo e regravadas em JPEG. Do arquivo gravado saem a miniatura
+# (lista do pescador) e a prévia (tela cheia); o original só é baixado quando pedido.
+ARQUIVO_MAX_PX = 2400
+ARQUIVO_QUALIDADE = 85
+DERIVADOS = {
+    "miniatura": (320, 75),
+    "previa": (1280, 80),
+}
+
+
+def _abrir(arquivo, max_px=None):
+    from PIL import Image, ImageOps
+
+    im = Image.open(arquivo)
+    if max_px and im.format == "JPEG":
+        # Decodifica já reduzido (1/2, 1/4, 1/8) quando sobra resolução: bem mais rápido
+        im.draft("RGB", (max_px, max_px))
+    im = ImageOps.exif_transpose(im)
+    if im.mode in ("RGBA", "LA", "P"):
+        im = im.convert("RGBA")
+        fundo = Image.new("RGB", im.size, (255, 255, 255))
+        fundo.paste(im, mask=im.getchannel("A"))
+        return fundo
+    return im.convert("RGB")
+
+
+def _jpeg(im, max_px, qualidade):
+    from PIL import Image
+
+    im.thumbnail((max_px, max_px), Image.LANCZOS)
+    buf = io.BytesIO()
+    im.save(buf, format="JPEG", quality=qualidade, optimize=True, progressive=True)
+    buf.seek(0)
+    return buf
+
+
+def normalizar(arquivo):
+    """JPEG normalizado (BytesIO) se `arquivo` for uma imagem, ou None (PDF etc.: grava como veio)."""
+    from PIL import Image
+
+    try:
+        arquivo.seek(0)
+        with Image.open(arquivo) as teste:
+            teste.verify()
+        arquivo.seek(0)
+        return _jpeg(_abrir(arquivo, ARQUIVO_MAX_PX), ARQUIVO_MAX_PX, ARQUIVO_QUALIDADE)
+    except Exception:
+        arquivo.seek(0)
+        return None
+
+
+def nome_derivado(nome_blob, tipo):
+    base, _ = os.path.splitext(nome_blob)
+    return f"{base}_{tipo}.jpg"
+
+
+def gerar_derivados(blob):
+    """Grava miniatura e prévia ao lado do blob; retorna False se o blob não for uma imagem."""
+    origem = os.path.join(settings.MEDIA_ROOT, blob.arquivo.name)
+    try:
+        im = _abrir(origem, DERIVADOS["previa"][0])
+    except Exception:
+        return False
+    for tipo, (max_px, qualidade) in sorted(DERIVADOS.items(), key=lambda d: -d[1][0]):
+        destino = os.path.join(settings.MEDIA_ROOT, nome_derivado(blob.arquivo.name, tipo))
+        tmp = f"{destino}.{os.getpid()}.tmp"
+        # Da maior para a menor: cada redução parte da anterior
+        with open(tmp, "wb") as out:
+            out.write(_jpeg(im, max_px, qualidade).getvalue())
+        os.replace(tmp, destino)
+    return True
@@ -0,0 +1,213 @@
+import codecs
+import csv
+from datetime import date, datetime
+
+from django.db import IntegrityError, transaction
+from stdnum.br import cpf as br_cpf
+
+from .models import Endereco, Pescador
+from .search import chave_busca, normalizar, somente_digitos
+
+CHUNK_SIZE = 1000
+
+# Cabeçalho do CSV (sem acentos, minúsculas) -> campo. Aceita os títulos da exportação de pescadores.
+COLUNAS = {
+    "nome": "nome",
+    "cpf": "cpf",
+    "rgp": "rgp",
+    "rg": "rg",
+    "orgao emissor": "rg_orgao_emissor",
+    "rg orgao emissor": "rg_orgao_emissor",
+    "nascimento": "data_nascimento",
+    "data nascimento": "data_nascimento",
+    "data de nascimento": "data_nascimento",
+    "telefone": "telefone",
+    "associacao": "data_associacao",
+    "data associacao": "data_associacao",
+    "data de associacao": "data_associacao",
+    "logradouro": "logradouro",
+    "numero": "numero",
+    "complemento": "complemento",
+    "bairro": "bairro",
+    "cidade": "cidade",
+    "uf": "estado",
+    "estado": "estado",
+    "cep": "cep",
+}
+OBRIGATORIOS = ("nome", "cpf", "rgp", "data_nascimento")
+ENDERECO = ("logradouro", "numero", "complemento", "bairro", "cidade", "estado", "cep")
+ENDERECO_OBRIGATORIOS = ("logradouro", "numero", "bairro", "cidade", "estado", "cep")
+LIMITES = {f.name: f.max_length for m in (Pescador, Endereco) for f in m._meta.fields if getattr(f, "max_length", None)}
+
+
+class Resultado:
+    def __init__(self):
+        self.criados = 0
+        self.linhas = 0
+        self.erros = []  # (linha do arquivo, mensagem)
+
+    def erro(self, linha, mensagem):
+        self.erros.append((linha, mensagem))
+
+
+def _data(valor):
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(valor, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _leitor(linhas):
+    """csv.reader com delimitador detectado (';' ou ',') a partir do cabeçalho."""
+    primeira = next(linhas, "")
+    delimitador = ";" if primeira.count(";") >= primeira.count(",") else ","
+
+    def todas():
+        yield primeira
+        yield from linhas
+
+    return csv.reader(todas(), delimiter=delimitador)
+
+
+def _validar(dados, cpfs, rgps):
+    """Retorna (Pescador, Endereco|None, erros) para uma linha já mapeada em campos."""
+    erros = []
+    for campo in OBRIGATORIOS:
+        if not dados.get(campo):
+            erros.append(f"{campo}: obrigatório")
+    for campo, valor in dados.items():
+        if campo in LIMITES and len(valor) > LIMITES[campo]:
+            erros.append(f"{campo}: máximo de {LIMITES[campo]} caracteres")
+
+    cpf = dados.get("cpf", "")
+    if cpf:
+        try:
+            cpf = br_cpf.format(br_cpf.validate(cpf))
+        except Exception:
+            erros.append("cpf: CPF inválido")
+        else:
+            if somente_digitos(cpf) in cpfs:
+                erros.append("cpf: já cadastrado")
+    rgp = dados.get("rgp", "")
+    if rgp and rgp.upper() in rgps:
+        erros.append("rgp: já cadastrado")
+
+    nascimento = associacao = None
+    if dados.get("data_nascimento"):
+        nascimento = _data(dados["data_nascimento"])
+        if not nascimento:
+            erros.append("data_nascimento: use DD/MM/AAAA")
+    if dados.get("data_associacao"):
+        associacao = _data(dados["data_associacao"])
+        if not associacao:
+            erros.append("data_associacao: use DD/MM/AAAA")
+
+    endereco = None
+    if any(dados.get(c) for c in ENDERECO):
+        faltando = [c for c in ENDERECO_OBRIGATORIOS if not dados.get(c)]
+        if faltando:
+            erros.append("endereço incompleto: falta " + ", ".join(faltando))
+        else:
+            endereco = Endereco(**{c: dados.get(c, "") for c in ENDERECO})
+            endereco.estado = endereco.estado.upper()
+
+    if erros:
+        return None, None, erros
+    p = Pescador(
+        nome=dados["nome"],
+        cpf=cpf,
+        rgp=rgp,
+        rg=dados.get("rg", ""),
+        rg_orgao_emissor=dados.get("rg_orgao_emissor", ""),
+        telefone=dados.get("telefone", ""),
+        data_nascimento=nascimento,
+        data_associacao=associacao or date.today(),
+        # bulk_create não chama save(): a chave de busca é preenchida aqui (o FTS5 segue via trigger)
+        busca=chave_busca(dados["nome"], cpf, rgp),
+    )
+    return p, endereco, []
+
+
+def _gravar(lote, resultado):
+    """Grava um lote [(linha, Pescador, Endereco|None)] em uma transação.
+
+    Se outro cadastro entrou com o mesmo CPF/RGP no meio do caminho, o lote é refeito linha a linha.
+    """
+    try:
+        with transaction.atomic():
+            Pescador.objects.bulk_create([p for _, p, _ in lote])
+            Endereco.objects.bulk_create([_vincular(e, p) for _, p, e in lote if e])
+        resultado.criados += len(lote)
+    except IntegrityError:
+        for linha, p, e in lote:
+            p.pk = None
+            try:
+                with transaction.atomic():
+                    p.save()
+                    if e:
+                        _vincular(e, p).save()
+                resultado.criados += 1
+            except IntegrityError:
+                resultado.erro(linha, "cpf/rgp: já cadastrado")
+
+
+def _vincular(endereco, pescador):
+    endereco.pescador = pescador
+    return endereco
+
+
+def verificar_codificacao(arquivo, codificacao, bloco=64 * 1024):
+    """Decodifica o arquivo binário inteiro (sem guardar o texto) e volta ao início.
+
+    Os lotes são gravados enquanto o arquivo é lido: um byte inválido na linha 1.500 deixaria as
+    1.000 primeiras importadas. Chamada antes de importar(), a UnicodeDecodeError vem antes da
+    primeira gravação.
+    """
+    decoder = codecs.getincrementaldecoder(codificacao)()
+    for parte in iter(lambda: arquivo.read(bloco), b""):
+        decoder.decode(parte)
+    decoder.decode(b"", final=True)
+    arquivo.seek(0)
+
+
+def importar(linhas, simular=False, chunk_size=CHUNK_SIZE):
+    """Importa pescadores de um CSV (iterável de linhas de texto, ex.: arquivo aberto).
+
+    O arquivo é lido como stream; CPFs e RGPs existentes são carregados uma vez em memória para a
+    checagem de duplicidade (inclusive entre linhas do próprio arquivo). Com `simular`, só valida.
+    """
+    resultado = Resultado()
+    leitor = _leitor(iter(linhas))
+    cabecalho = [COLUNAS.get(normalizar(c)) for c in next(leitor, [])]
+    faltando = [c for c in OBRIGATORIOS if c not in cabecalho]
+    if faltando:
+        resultado.erro(1, "cabeçalho sem as colunas: " + ", ".join(faltando))
+        return resultado
+
+    cpfs = {somente_digitos(c) for c in Pescador.objects.values_list("cpf", flat=True).iterator()}
+    rgps = {r.upper() for r in Pescador.objects.values_list("rgp", flat=True).iterator()}
+
+    lote = []
+    for numero, valores in enumerate(leitor, start=2):
+        if not any(v.strip() for v in valores):
+            continue
+        resultado.linhas += 1
+        dados = {campo: v.strip() for campo, v in zip(cabecalho, valores) if campo}
+        p, endereco, erros = _validar(dados, cpfs, rgps)
+        if erros:
+            resultado.erro(numero, "; ".join(erros))
+            continue
+        cpfs.add(somente_digitos(p.cpf))
+        rgps.add(p.rgp.upper())
+        if simular:
+            resultado.criados += 1
+            continue
+        lote.append((numero, p, endereco))
+        if len(lote) >= chunk_size:
+            _gravar(lote, resultado)
+            lote = []
+    if lote:
+        _gravar(lote, resultado)
+    return resultado
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import sys
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+
+from .models import Carimbo
+
+# Inicialização rápida do container (comando preparar_inicio, chamado pelo entrypoint.prod.sh):
+# migrate e collectstatic só rodam quando a impressão digital das migrações ou dos estáticos muda.
+# O carimbo das migrações fica no banco (um banco restaurado traz o carimbo correspondente);
+# o dos estáticos fica em STATIC_ROOT, o volume que o collectstatic preenche. Os carimbos só servem
+# para pular etapas: a sonda /pronto/ olha o plano do migrate.
+CARIMBO_MIGRACOES = "migracoes"
+CARIMBO_ESTATICOS = ".carimbo-estaticos"
+PRONTO_PATH = "/pronto/"
+
+_migrado = []
+
+
+def impressao_migracoes():
+    """SHA-256 dos arquivos de migração de todos os apps (o grafo que o migrate aplicaria)."""
+    from django.db.migrations.loader import MigrationLoader
+
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    h = hashlib.sha256()
+    for chave in sorted(loader.disk_migrations):
+        modulo = sys.modules[loader.disk_migrations[chave].__module__]
+        h.update("/".join(chave).encode() + b"\0")
+        with open(modulo.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def impressao_estaticos():
+    """SHA-256 dos arquivos que o collectstatic copiaria (caminho e conteúdo) e do storage usado."""
+    from django.contrib.staticfiles.finders import get_finders
+
+    h = hashlib.sha256(repr(settings.STORAGES.get("staticfiles")).encode())
+    for finder in get_finders():
+        for caminho, storage in sorted(finder.list(["CVS", ".*", "*~"]), key=lambda f: f[0]):
+            h.update(caminho.encode() + b"\0")
+            with storage.open(caminho) as f:
+                for parte in iter(lambda: f.read(64 * 1024), b""):
+                    h.update(parte)
+    return h.hexdigest()
+
+
+def carimbo_migracoes():
+    """Carimbo gravado no banco, ou None (sem carimbo ou tabela ainda não criada)."""
+    try:
+        return Carimbo.objects.filter(nome=CARIMBO_MIGRACOES).values_list("valor", flat=True).first()
+    except DatabaseError:
+        return None
+
+
+def gravar_carimbo_migracoes(valor):
+    Carimbo.objects.update_or_create(nome=CARIMBO_MIGRACOES, defaults={"valor": valor})
+
+
+def _caminho_carimbo_estaticos():
+    return os.path.join(settings.STATIC_ROOT, CARIMBO_ESTATICOS)
+
+
+def carimbo_estaticos():
+    try:
+        with open(_caminho_carimbo_estaticos()) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def gravar_carimbo_estaticos(valor):
+    os.makedirs(settings.STATIC_ROOT, exist_ok=True)
+    with open(_caminho_carimbo_estaticos(), "w") as f:
+        f.write(valor + "\n")
+
+
+def pronto():
+    """(True, "ok") se o banco responde e as migrações deste código já foram aplicadas.
+
+    Consulta o plano do migrate (não o carimbo): um `migrate` manual também deixa a instância pronta.
+    """
+    from django.db.migrations.executor import MigrationExecutor
+
+    try:
+        if _migrado:
+            # Migrações não se desfazem com o processo rodando: daqui em diante basta o banco responder
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True, "ok"
+        executor = MigrationExecutor(connection)
+        pendentes = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    except DatabaseError:
+        return False, "banco indisponível"
+    if pendentes:
+        return False, "migrações pendentes"
+    _migrado.append(True)
+    return True, "ok"
+
+
+class ProntoMiddleware:
+    """Responde /pronto/ antes de sessão, host e métricas: sonda de prontidão (healthcheck do compose)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path != PRONTO_PATH:
+            return self.get_response(request)
+        ok, motivo = pronto()
+        response = HttpResponse(motivo, content_type="text/plain; charset=utf-8", status=200 if ok else 503)
+        response["Cache-Control"] = "no-store"
+        return response
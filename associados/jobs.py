@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import metricas
+from .cache import config_versao
+from .models import AssociacaoConfig, Mensalidade, Pescador, PdfJob
+
+# Cache persistente de PDFs: MEDIA_ROOT/pdf_cache/ab/abcdef....pdf, nome = sha256 das entradas.
+# Mesma entrada -> mesmo arquivo; qualquer mudança (mensalidade, documentos, pescador, configuração,
+# data de emissão) gera outra chave, então não há invalidação explícita, só limpeza por idade.
+PDF_CACHE_DIR = "pdf_cache"
+MAX_TENTATIVAS = 3
+PROCESSANDO_TIMEOUT = timedelta(minutes=10)
+# Um job em erro volta para a fila quando pedido de novo depois desse intervalo; antes disso a
+# página de espera (que não se recarrega em erro) mostra a falha em vez de reenfileirar em laço
+ERRO_NOVA_TENTATIVA = timedelta(minutes=1)
+
+
+def _hash(partes):
+    raw = json.dumps(partes, default=str, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def chave_recibo(mensalidade, base_url):
+    p = mensalidade.pescador
+    return _hash([
+        "recibo", mensalidade.pk, mensalidade.competencia, mensalidade.valor, mensalidade.status,
+        mensalidade.data_pagamento, mensalidade.forma_pagamento, mensalidade.observacao,
+        mensalidade.recibo_numero, mensalidade.recibo_token,
+        p.nome, p.cpf, p.rgp,
+        config_versao(), base_url, date.today(),
+    ])
+
+
+def chave_dossie(pescador, ano):
+    docs = list(pescador.documentos.order_by("pk").values_list("pk", "tipo", "data_upload"))
+    mens = list(
+        Mensalidade.objects.filter(pescador=pescador, competencia__year=ano)
+        .order_by("pk")
+        .values_list("pk", "competencia", "status", "valor", "data_pagamento")
+    )
+    return _hash([
+        "dossie", pescador.pk, pescador.nome, pescador.cpf, pescador.rgp, pescador.data_associacao,
+        docs, mens, ano, config_versao(), date.today(),
+    ])
+
+
+def caminho(chave):
+    return os.path.join(settings.MEDIA_ROOT, PDF_CACHE_DIR, chave[:2], f"{chave}.pdf")
+
+
+def _carregar(tipo, objeto_id):
+    if tipo == "recibo":
+        return Mensalidade.objects.select_related("pescador").get(pk=objeto_id)
+    return Pescador.objects.get(pk=objeto_id)
+
+
+def _chave(tipo, obj, base_url):
+    if tipo == "recibo":
+        return chave_recibo(obj, base_url)
+    return chave_dossie(obj, date.today().year)
+
+
+def renderizar(tipo, obj, base_url, destino):
+    """Gera o PDF em um arquivo temporário e move para `destino` (escrita atômica)."""
+    from . import pdf
+
+    config = AssociacaoConfig.get_cached()
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    # Nome único por chamada: duas threads do mesmo processo podem gerar a mesma chave
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out, metricas.medir_pdf(tipo):
+            if tipo == "recibo":
+                pdf.render_recibos(out, [obj], config, lambda m: pdf.recibo_verify_url(base_url, m))
+            else:
+                pdf.render_dossie(out, obj, config, date.today().year)
+        os.chmod(tmp, 0o644)  # mkstemp cria com 0600; o nginx serve o arquivo
+        os.replace(tmp, destino)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def obter(tipo, obj, base_url):
+    """Retorna (caminho, None) se o PDF já está em disco, ou (None, job) se foi enfileirado.
+
+    Com PDF_ASYNC desligado (desenvolvimento, sem worker) o PDF é gerado na hora e gravado no cache.
+    """
+    chave = _chave(tipo, obj, base_url)
+    destino = caminho(chave)
+    if os.path.exists(destino):
+        return destino, None
+    if not settings.PDF_ASYNC:
+        renderizar(tipo, obj, base_url, destino)
+        return destino, None
+    job, created = PdfJob.objects.get_or_create(
+        chave=chave, defaults={"tipo": tipo, "objeto_id": obj.pk, "base_url": base_url}
+    )
+    if not created and job.status == "processando" and _marcar_abandonados(PdfJob.objects.filter(pk=job.pk)):
+        job.refresh_from_db()
+    if not created and (
+        job.status == "pronto"  # arquivo removido pela limpeza: gerar de novo
+        or (job.status == "erro" and job.concluido_em and job.concluido_em < timezone.now() - ERRO_NOVA_TENTATIVA)
+    ):
+        reiniciado = PdfJob.objects.filter(pk=job.pk, status=job.status).update(
+            status="pendente", tentativas=0, erro=""
+        )
+        if reiniciado:
+            job.status, job.tentativas, job.erro = "pendente", 0, ""
+    return None, job
+
+
+def _marcar_abandonados(qs):
+    """Marca como 'erro' os jobs travados em 'processando' que já usaram todas as tentativas.
+
+    O worker morreu no meio da última (OOM, SIGKILL): proximo_job não os pega mais, e sem isso a
+    página de espera ficaria se recarregando até a chave mudar. Em 'erro', obter() os reenfileira
+    depois de ERRO_NOVA_TENTATIVA.
+    """
+    agora = timezone.now()
+    return qs.filter(
+        status="processando", iniciado_em__lt=agora - PROCESSANDO_TIMEOUT, tentativas__gte=MAX_TENTATIVAS
+    ).update(status="erro", erro="Geração interrompida (worker encerrado).", concluido_em=agora)
+
+
+def proximo_job():
+    """Reserva o próximo job pendente (ou travado em 'processando'). Seguro com vários workers."""
+    _marcar_abandonados(PdfJob.objects.all())
+    limite = timezone.now() - PROCESSANDO_TIMEOUT
+    candidatos = PdfJob.objects.filter(
+        Q(status="pendente") | Q(status="processando", iniciado_em__lt=limite),
+        tentativas__lt=MAX_TENTATIVAS,
+    ).order_by("criado_em")
+    for job in candidatos[:10]:
+        # Reserva otimista: só um worker consegue trocar o status a partir do valor lido
+        reservado = PdfJob.objects.filter(pk=job.pk, status=job.status, tentativas=job.tentativas).update(
+            status="processando", iniciado_em=timezone.now(), tentativas=job.tentativas + 1
+        )
+        if reservado:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def executar(job):
+    try:
+        obj = _carregar(job.tipo, job.objeto_id)
+        if _chave(job.tipo, obj, job.base_url) != job.chave:
+            # As entradas mudaram desde o pedido: a próxima requisição enfileira a chave nova
+            job.status, job.erro = "erro", "Job obsoleto: entradas alteradas."
+        else:
+            renderizar(job.tipo, obj, job.base_url, caminho(job.chave))
+            job.status, job.erro = "pronto", ""
+    except Exception as exc:
+        job.status = "erro" if job.tentativas >= MAX_TENTATIVAS else "pendente"
+        job.erro = repr(exc)
+    job.concluido_em = timezone.now()
+    job.save(update_fields=["status", "erro", "concluido_em"])
+    return job
+
+
+def limpar(dias):
+    """Remove jobs concluídos e PDFs em cache mais antigos que `dias`."""
+    limite = timezone.now() - timedelta(days=dias)
+    removidos, _ = PdfJob.objects.filter(status__in=["pronto", "erro"], concluido_em__lt=limite).delete()
+    arquivos = 0
+    pasta = os.path.join(settings.MEDIA_ROOT, PDF_CACHE_DIR)
+    corte = time.time() - dias * 86400
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            path = os.path.join(raiz, nome)
+            try:
+                if os.path.getmtime(path) < corte:
+                    os.remove(path)
+                    arquivos += 1
+            except OSError:
+                pass
+    return removidos, arquivos
@@ -0,0 +1,159 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from associados import jobs
+from associados.models import CaixaLancamento, Mensalidade, Pescador
+
+BASE_URL = "http://localhost"
+USUARIO = "_benchmark"
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _remover(caminho):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede tempo e número de consultas das páginas principais (lista/busca, pescador, relatórios, "
+        "Caixa, recibo e dossiê em PDF) no banco atual e grava o resultado em JSON. "
+        "Gere dados antes com gerar_dados_sinteticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticoes", type=int, default=5)
+        parser.add_argument("--busca", default="silva", help="Termo usado na busca de pescadores")
+        parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: stdout)")
+        parser.add_argument("--comparar", help="JSON de uma execução anterior: mostra a variação por página")
+
+    def alvos(self):
+        """(nome, url, limpar) de cada página medida; `limpar` apaga o PDF em cache antes de cada medição."""
+        m = Mensalidade.objects.select_related("pescador").filter(status="pago").order_by("-competencia", "pk").first()
+        pescador = m.pescador if m else Pescador.objects.order_by("pk").first()
+        if pescador is None:
+            raise CommandError("Banco sem pescadores: rode gerar_dados_sinteticos antes.")
+        alvos = [
+            ("pescador_list", reverse("associados:pescador_list"), None),
+            ("pescador_busca", reverse("associados:pescador_list") + f"?q={self.busca}", None),
+            ("pescador_detail", reverse("associados:pescador_detail", args=[pescador.pk]), None),
+            ("relatorios", reverse("associados:relatorios"), None),
+            ("caixa", reverse("associados:caixa"), None),
+        ]
+        if m:
+            alvos.append((
+                "recibo_pdf", reverse("associados:recibo_pdf", args=[m.pk]),
+                lambda: _remover(jobs.caminho(jobs.chave_recibo(m, BASE_URL))),
+            ))
+        alvos.append((
+            "defeso_dossie_pdf", reverse("associados:defeso_dossie_pdf", args=[pescador.pk]),
+            lambda: _remover(jobs.caminho(jobs.chave_dossie(pescador, date.today().year))),
+        ))
+        return alvos
+
+    def medir(self, client, url, limpar, repeticoes):
+        tempos, consultas, status = [], [], None
+        for _ in range(repeticoes):
+            if limpar:
+                limpar()
+            with CaptureQueriesContext(connection) as ctx:
+                inicio = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            response.close()
+            consultas.append(len(ctx.captured_queries))
+            status = response.status_code
+        return {
+            "status": status,
+            "primeira_ms": round(tempos[0], 2),
+            "mediana_ms": round(statistics.median(tempos), 2),
+            "min_ms": round(min(tempos), 2),
+            "max_ms": round(max(tempos), 2),
+            "consultas": max(consultas),
+        }
+
+    def handle(self, *args, **options):
+        if options["repeticoes"] < 1:
+            raise CommandError("--repeticoes deve ser >= 1")
+        self.busca = options["busca"]
+        User = get_user_model()
+        usuario, _ = User.objects.get_or_create(username=USUARIO, defaults={"is_staff": True, "is_superuser": True})
+        usuario.set_unusable_password()
+        usuario.save()
+        resultados = {}
+        try:
+            client = Client(HTTP_HOST="localhost")
+            client.force_login(usuario)
+            # PDFs gerados na própria requisição (sem pdf_worker) e entregues pelo Django
+            with override_settings(PDF_ASYNC=False, MEDIA_X_ACCEL=False, ALLOWED_HOSTS=["localhost"]):
+                for nome, url, limpar in self.alvos():
+                    resultados[nome] = {"url": url, **self.medir(client, url, limpar, options["repeticoes"])}
+                    if options["verbosity"] > 1:
+                        self.stderr.write(f"{nome}: {resultados[nome]['mediana_ms']} ms")
+        finally:
+            usuario.delete()
+
+        relatorio = {
+            "commit": _commit(),
+            "data": timezone.now().isoformat(timespec="seconds"),
+            "banco": connection.vendor,
+            "repeticoes": options["repeticoes"],
+            "dados": {
+                "pescadores": Pescador.objects.count(),
+                "mensalidades": Mensalidade.objects.count(),
+                "caixa": CaixaLancamento.objects.count(),
+            },
+            "resultados": resultados,
+        }
+        texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as f:
+                f.write(texto + "\n")
+        else:
+            self.stdout.write(texto)
+        if options["comparar"]:
+            self.comparar(options["comparar"], resultados)
+
+    def comparar(self, caminho, resultados):
+        try:
+            with open(caminho, encoding="utf-8") as f:
+                anterior = json.load(f)["resultados"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Não foi possível ler {caminho}: {exc}")
+        for nome, atual in resultados.items():
+            antes = anterior.get(nome)
+            if not antes:
+                continue
+            variacao = (atual["mediana_ms"] - antes["mediana_ms"]) / antes["mediana_ms"] * 100 if antes["mediana_ms"] else 0
+            linha = (
+                f"{nome:<20} {antes['mediana_ms']:>9.2f} -> {atual['mediana_ms']:>9.2f} ms ({variacao:+.0f}%)"
+                f"  consultas {antes['consultas']} -> {atual['consultas']}"
+            )
+            piorou = variacao > 20 or atual["consultas"] > antes["consultas"]
+            self.stderr.write(self.style.WARNING(linha) if piorou else linha)
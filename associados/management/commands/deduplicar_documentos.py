@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from associados.armazenamento import armazenar
+from associados.models import Documento
+
+
+class Command(BaseCommand):
+    help = "Move os documentos antigos (documentos/<nome>) para o armazenamento por conteúdo, removendo duplicados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--simular", action="store_true", help="Só lista o que seria feito")
+
+    def handle(self, *args, **options):
+        migrados = faltando = liberados = 0
+        pendentes = Documento.objects.filter(blob__isnull=True).exclude(arquivo="").only("pk", "arquivo")
+        for doc in pendentes.iterator(chunk_size=200):
+            origem = os.path.join(settings.MEDIA_ROOT, doc.arquivo.name)
+            if not os.path.exists(origem):
+                faltando += 1
+                self.stderr.write(f"Documento {doc.pk}: arquivo não encontrado ({doc.arquivo.name})")
+                continue
+            tamanho = os.path.getsize(origem)
+            if options["simular"]:
+                migrados += 1
+                continue
+            with transaction.atomic():
+                with open(origem, "rb") as f:
+                    blob = armazenar(f, doc.arquivo.name)
+                Documento.objects.filter(pk=doc.pk).update(blob=blob, arquivo=blob.arquivo.name)
+            if os.path.abspath(origem) != os.path.abspath(os.path.join(settings.MEDIA_ROOT, blob.arquivo.name)):
+                os.remove(origem)
+                if blob.referencias > 1:
+                    liberados += tamanho
+            migrados += 1
+
+        verbo = "a migrar" if options["simular"] else "migrado(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{migrados} documento(s) {verbo}; {faltando} sem arquivo; {liberados / 1024 / 1024:.1f} MB liberados por duplicidade."
+        ))
@@ -0,0 +1,32 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from associados.mensalidades import gerar_competencias
+from associados.utils import parse_competencia
+
+
+class Command(BaseCommand):
+    help = "Cria as mensalidades que faltam para todos os associados em um intervalo de competências."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--de", required=True, help="Competência inicial (AAAA-MM)")
+        parser.add_argument("--ate", help="Competência final (AAAA-MM); padrão: igual a --de")
+        parser.add_argument("--valor", help="Valor da mensalidade (padrão: valor da associação)")
+
+    def handle(self, *args, **options):
+        de = parse_competencia(options["de"])
+        ate = parse_competencia(options["ate"]) if options["ate"] else de
+        if not de or not ate or ate < de:
+            raise CommandError("Intervalo de competências inválido. Use AAAA-MM.")
+        valor = None
+        if options["valor"]:
+            try:
+                valor = Decimal(options["valor"].replace(",", "."))
+            except InvalidOperation:
+                raise CommandError("Valor inválido.")
+        res = gerar_competencias(de, ate, valor=valor)
+        self.stdout.write(self.style.SUCCESS(
+            f"{res['criadas']} mensalidade(s) criada(s) para {res['pescadores']} pescador(es); "
+            f"{res['existentes']} já existiam."
+        ))
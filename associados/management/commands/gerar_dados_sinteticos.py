@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from associados.models import Pescador
+from associados.sinteticos import Escala, gerar
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera pescadores, endereços, documentos, mensalidades e lançamentos do Caixa sintéticos "
+        "(determinísticos pela semente) para medir o sistema em escala."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pescadores", type=int, default=1000)
+        parser.add_argument("--anos", type=int, default=3, help="Anos de mensalidades até o mês final")
+        parser.add_argument("--caixa", type=int, default=10000, help="Lançamentos no Caixa")
+        parser.add_argument("--documentos", type=int, default=2, help="Documentos por pescador (0 a 6)")
+        parser.add_argument("--ate", help="Mês final AAAA-MM (padrão: mês atual); fixe para repetir os mesmos dados")
+        parser.add_argument("--semente", type=int, default=1)
+        parser.add_argument("--forcar", action="store_true", help="Gera mesmo com pescadores já cadastrados")
+
+    def handle(self, *args, **options):
+        ate = None
+        if options["ate"]:
+            try:
+                ate = datetime.strptime(options["ate"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("--ate deve estar no formato AAAA-MM")
+        if options["anos"] < 1 or options["pescadores"] < 0 or options["caixa"] < 0:
+            raise CommandError("--anos deve ser >= 1; --pescadores e --caixa, >= 0")
+        if Pescador.objects.exists() and not options["forcar"]:
+            raise CommandError("Já existem pescadores neste banco. Use um banco vazio ou --forcar.")
+
+        escala = Escala(
+            pescadores=options["pescadores"],
+            anos=options["anos"],
+            caixa=options["caixa"],
+            documentos=max(options["documentos"], 0),
+            ate=ate,
+            semente=options["semente"],
+        )
+
+        def progresso(totais):
+            self.stdout.write(f"{totais['pescadores']}/{escala.pescadores} pescador(es)...")
+
+        totais = gerar(escala, progresso=progresso if options["verbosity"] > 1 else None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{totais['pescadores']} pescador(es), {totais['mensalidades']} mensalidade(s), "
+            f"{totais['documentos']} documento(s) e {totais['caixa']} lançamento(s) no Caixa gerados "
+            f"({escala.inicio:%m/%Y} a {escala.ate:%m/%Y})."
+        ))
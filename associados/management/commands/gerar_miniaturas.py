@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from associados.imagens import gerar_derivados
+from associados.models import Arquivo
+
+
+class Command(BaseCommand):
+    help = "Gera miniatura e prévia dos documentos de imagem que ainda não têm (ex.: após deduplicar_documentos)."
+
+    def handle(self, *args, **options):
+        geradas = 0
+        for blob in Arquivo.objects.filter(imagem=False).iterator(chunk_size=200):
+            if gerar_derivados(blob):
+                Arquivo.objects.filter(pk=blob.pk).update(imagem=True)
+                geradas += 1
+        self.stdout.write(self.style.SUCCESS(f"Miniaturas geradas para {geradas} arquivo(s)."))
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from associados import pdf
+from associados.models import AssociacaoConfig
+from associados.mensalidades import recibos_lote_queryset
+from associados.utils import parse_competencia
+
+
+class Command(BaseCommand):
+    help = "Gera um único PDF com os recibos das mensalidades pagas (por competência e/ou pescador)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--de", help="Competência inicial (AAAA-MM)")
+        parser.add_argument("--ate", help="Competência final (AAAA-MM)")
+        parser.add_argument("--pescador", type=int, help="ID do pescador")
+        parser.add_argument("--por-pagina", type=int, choices=[1, 2], default=1)
+        parser.add_argument("-o", "--output", default="recibos.pdf")
+        parser.add_argument("--base-url", default=settings.SITE_URL, help="URL pública usada no QR Code")
+
+    def handle(self, *args, **options):
+        de = parse_competencia(options["de"]) if options["de"] else None
+        ate = parse_competencia(options["ate"]) if options["ate"] else None
+        if (options["de"] and not de) or (options["ate"] and not ate):
+            raise CommandError("Competência inválida. Use AAAA-MM.")
+        if not (de or ate or options["pescador"]):
+            raise CommandError("Informe --de/--ate e/ou --pescador.")
+
+        base_url = options["base_url"]
+        qs = recibos_lote_queryset(de, ate, options["pescador"])
+        with open(options["output"], "wb") as out:
+            total = pdf.render_recibos(
+                out,
+                qs.iterator(chunk_size=500),
+                AssociacaoConfig.get_cached(),
+                lambda m: pdf.recibo_verify_url(base_url, m),
+                options["por_pagina"],
+            )
+        self.stdout.write(self.style.SUCCESS(f"{total} recibo(s) gravado(s) em {options['output']}."))
@@ -0,0 +1,36 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from associados.importar import importar
+
+
+class Command(BaseCommand):
+    help = "Importa pescadores (e endereços) de um arquivo CSV, com relatório de erros por linha."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do CSV (separado por ';' ou ',')")
+        parser.add_argument("--encoding", default="utf-8-sig", help="Codificação do arquivo (padrão: utf-8-sig)")
+        parser.add_argument("--simular", action="store_true", help="Só valida, sem gravar")
+        parser.add_argument("--relatorio", help="Grava os erros (linha;mensagem) neste CSV")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["arquivo"], encoding=options["encoding"], newline="") as f:
+                res = importar(f, simular=options["simular"])
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f"Não foi possível ler o arquivo: {exc}")
+
+        if options["relatorio"]:
+            with open(options["relatorio"], "w", encoding="utf-8-sig", newline="") as out:
+                writer = csv.writer(out, delimiter=";")
+                writer.writerow(["Linha", "Erro"])
+                writer.writerows(res.erros)
+        else:
+            for linha, msg in res.erros:
+                self.stderr.write(f"Linha {linha}: {msg}")
+
+        verbo = "válido(s)" if options["simular"] else "importado(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{res.criados} pescador(es) {verbo} de {res.linhas} linha(s); {len(res.erros)} erro(s)."
+        ))
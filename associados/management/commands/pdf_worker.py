@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from associados import jobs, metricas
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de PDFs (recibos e dossiês) fora das requisições web."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Processa os jobs pendentes e sai")
+        parser.add_argument("--intervalo", type=float, default=1.0, help="Espera (s) quando a fila está vazia")
+        parser.add_argument("--limpar-dias", type=int, default=7, help="Idade máxima de PDFs em cache e jobs concluídos")
+
+    def handle(self, *args, **options):
+        ultima_limpeza = 0
+        while True:
+            close_old_connections()
+            if time.monotonic() - ultima_limpeza > 3600:
+                jobs_rem, arquivos_rem = jobs.limpar(options["limpar_dias"])
+                if jobs_rem or arquivos_rem:
+                    self.stdout.write(f"Limpeza: {jobs_rem} job(s), {arquivos_rem} arquivo(s) removidos.")
+                ultima_limpeza = time.monotonic()
+            job = jobs.proximo_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["intervalo"])
+                continue
+            inicio = time.monotonic()
+            job = jobs.executar(job)
+            # Publica o tempo do job já: o SIGTERM do docker não roda o atexit
+            metricas.flush()
+            self.stdout.write(f"{job} em {time.monotonic() - inicio:.2f}s {job.erro}".rstrip())
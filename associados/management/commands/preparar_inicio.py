@@ -0,0 +1,42 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from associados import inicio
+
+
+class Command(BaseCommand):
+    help = (
+        "Inicialização do container: roda migrate e collectstatic só quando as migrações ou os "
+        "arquivos estáticos mudaram desde o último carimbo."
+    )
+    # As verificações já rodam no migrate quando ele é necessário
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--forcar", action="store_true", help="Roda as duas etapas mesmo sem mudanças")
+
+    def handle(self, *args, **options):
+        verbosity = options["verbosity"]
+        self.etapa(
+            "Migrações", inicio.impressao_migracoes, inicio.carimbo_migracoes, inicio.gravar_carimbo_migracoes,
+            lambda: call_command("migrate", interactive=False, verbosity=verbosity),
+            options["forcar"],
+        )
+        self.etapa(
+            "Arquivos estáticos", inicio.impressao_estaticos, inicio.carimbo_estaticos, inicio.gravar_carimbo_estaticos,
+            lambda: call_command("collectstatic", interactive=False, verbosity=verbosity),
+            options["forcar"],
+        )
+
+    def etapa(self, titulo, impressao, carimbo, gravar, executar, forcar):
+        t = time.monotonic()
+        atual = impressao()
+        if not forcar and carimbo() == atual:
+            self.stdout.write(f"{titulo}: sem mudanças ({atual[:12]}), etapa pulada em {time.monotonic() - t:.2f}s.")
+            return
+        executar()
+        # Só depois do sucesso: se a etapa falhar, roda de novo no próximo início
+        gravar(atual)
+        self.stdout.write(self.style.SUCCESS(f"{titulo}: concluído em {time.monotonic() - t:.2f}s ({atual[:12]})."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from associados.models import CaixaSaldoMensal
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os resumos mensais do Caixa (por categoria) e o saldo acumulado de cada mês."
+
+    def handle(self, *args, **options):
+        resumos, meses = CaixaSaldoMensal.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"{resumos} resumo(s) por categoria em {meses} mês(es) gravado(s)."))
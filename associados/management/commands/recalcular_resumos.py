@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from associados.models import ResumoAnual
+
+
+class Command(BaseCommand):
+    help = "Reconstrói a tabela de resumos anuais (pagas/pendentes/isentas por pescador e ano)."
+
+    def handle(self, *args, **options):
+        total = ResumoAnual.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"{total} resumo(s) anual(is) gravado(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from associados.models import Pescador
+from associados.search import chave_busca, instalar_indice
+
+
+class Command(BaseCommand):
+    help = "Recalcula a chave de busca dos pescadores e reconstrói o índice FTS5/trigram."
+
+    def handle(self, *args, **options):
+        alterados = 0
+        with transaction.atomic():
+            for p in Pescador.objects.only("id", "nome", "cpf", "rgp", "busca").iterator(chunk_size=2000):
+                chave = chave_busca(p.nome, p.cpf, p.rgp)
+                if chave != p.busca:
+                    Pescador.objects.filter(pk=p.pk).update(busca=chave)
+                    alterados += 1
+        with connection.schema_editor() as schema_editor:
+            instalar_indice(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f"{alterados} chave(s) de busca atualizada(s); índice reconstruído."))
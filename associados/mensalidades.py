@@ -0,0 +1,82 @@
+from django.db import transaction
+
+from .models import AssociacaoConfig, Mensalidade, Pescador, ResumoAnual
+from .utils import proxima_competencia
+
+CHUNK_PESCADORES = 500
+BATCH_SIZE = 1000
+# O ReportLab mantém todas as páginas em memória até o save() (~14 KB por recibo) e gera
+# ~1.000 recibos em 8 s: lotes maiores são divididos em arquivos de até RECIBOS_POR_ARQUIVO.
+RECIBOS_POR_ARQUIVO = 500
+# Geração em lote pela web (uma requisição): até 3 anos de competências por vez
+MAX_COMPETENCIAS_LOTE = 36
+
+
+def competencias_entre(de, ate):
+    comp = de.replace(day=1)
+    while comp <= ate:
+        yield comp
+        comp = proxima_competencia(comp)
+
+
+def gerar_competencias(de, ate, pescadores=None, valor=None, desde_associacao=True):
+    """Cria as mensalidades que faltam para os pescadores no intervalo [de, ate] via bulk_create.
+
+    `pescadores` é um QuerySet (padrão: todos os associados até `ate`). Com `desde_associacao`,
+    meses anteriores ao mês de associação de cada pescador são pulados.
+    Retorna {"pescadores": n, "criadas": n, "existentes": n}.
+    """
+    comps = list(competencias_entre(de, ate))
+    if not comps:
+        return {"pescadores": 0, "criadas": 0, "existentes": 0}
+    anos = {c.year for c in comps}
+    if valor is None:
+        valor = AssociacaoConfig.get_cached().valor_mensalidade_padrao
+    if pescadores is None:
+        pescadores = Pescador.objects.filter(data_associacao__lt=proxima_competencia(comps[-1]))
+    no_intervalo = Mensalidade.objects.filter(competencia__gte=comps[0], competencia__lt=proxima_competencia(comps[-1]))
+
+    total_pescadores = criadas = existentes = 0
+    linhas = pescadores.order_by("pk").values_list("pk", "data_associacao")
+    ultimo_pk = 0
+    while True:
+        chunk = list(linhas.filter(pk__gt=ultimo_pk)[:CHUNK_PESCADORES])
+        if not chunk:
+            break
+        ultimo_pk = chunk[-1][0]
+        ids = [pk for pk, _ in chunk]
+        ja_existem = set(no_intervalo.filter(pescador_id__in=ids).values_list("pescador_id", "competencia"))
+        novas = []
+        for pk, data_associacao in chunk:
+            inicio = data_associacao.replace(day=1) if desde_associacao and data_associacao else None
+            for comp in comps:
+                if inicio and comp < inicio:
+                    continue
+                if (pk, comp) in ja_existem:
+                    continue
+                novas.append(Mensalidade(pescador_id=pk, competencia=comp, valor=valor))
+        if novas:
+            with transaction.atomic():
+                do_chunk = no_intervalo.filter(pescador_id__in=ids)
+                antes = do_chunk.count()
+                # ignore_conflicts: outra requisição pode ter criado a mesma competência nesse meio tempo;
+                # as linhas puladas não voltam marcadas, então as criadas são contadas depois do insert
+                Mensalidade.objects.bulk_create(novas, batch_size=BATCH_SIZE, ignore_conflicts=True)
+                criadas += do_chunk.count() - antes
+                # bulk_create não passa por Mensalidade.save(): atualiza os resumos do chunk aqui
+                ResumoAnual.recalcular(ids, anos)
+        total_pescadores += len(chunk)
+        existentes += len(ja_existem)
+    return {"pescadores": total_pescadores, "criadas": criadas, "existentes": existentes}
+
+
+def recibos_lote_queryset(de=None, ate=None, pescador_id=None):
+    """Mensalidades pagas no intervalo de competências [de, ate], numa única consulta com o pescador."""
+    qs = Mensalidade.objects.filter(status="pago").select_related("pescador")
+    if de:
+        qs = qs.filter(competencia__gte=de)
+    if ate:
+        qs = qs.filter(competencia__lt=proxima_competencia(ate))
+    if pescador_id:
+        qs = qs.filter(pescador_id=pescador_id)
+    return qs.order_by("competencia", "pescador__nome", "pk")
@@ -0,0 +1,198 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+# Métricas por view (nome da URL): histograma de latência, número e tempo de consultas SQL,
+# e histograma do tempo de geração de PDFs. Cada processo (worker do gunicorn, pdf_worker)
+# acumula em memória e, a cada METRICAS_FLUSH segundos, soma seus incrementos no arquivo
+# compartilhado METRICAS_ARQUIVO sob flock. Os contadores sobrevivem à reciclagem dos workers.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SEM_ROTA = "<sem_rota>"
+
+_lock = threading.Lock()
+_pendente = {}
+_ultimo_flush = [time.monotonic()]
+
+
+def _vazio():
+    return {"latencia": {}, "sql": {}, "pdf": {}}
+
+
+def _histograma(destino, chave, valor):
+    h = destino.setdefault(chave, {"buckets": [0] * len(BUCKETS), "soma": 0.0, "total": 0})
+    for i, limite in enumerate(BUCKETS):
+        if valor <= limite:
+            h["buckets"][i] += 1
+            break
+    h["soma"] += valor
+    h["total"] += 1
+
+
+def _somar(base, delta):
+    for chave, h in delta["latencia"].items():
+        _somar_histograma(base["latencia"], chave, h)
+    for chave, h in delta["pdf"].items():
+        _somar_histograma(base["pdf"], chave, h)
+    for chave, (consultas, segundos) in delta["sql"].items():
+        atual = base["sql"].setdefault(chave, [0, 0.0])
+        atual[0] += consultas
+        atual[1] += segundos
+    return base
+
+
+def _somar_histograma(destino, chave, h):
+    atual = destino.setdefault(chave, {"buckets": [0] * len(BUCKETS), "soma": 0.0, "total": 0})
+    if len(h["buckets"]) != len(BUCKETS):
+        return  # gravado com outros BUCKETS: descarta
+    atual["buckets"] = [a + b for a, b in zip(atual["buckets"], h["buckets"])]
+    atual["soma"] += h["soma"]
+    atual["total"] += h["total"]
+
+
+def _flush_se_vencido():
+    if time.monotonic() - _ultimo_flush[0] >= settings.METRICAS_FLUSH:
+        flush()
+
+
+def registrar_requisicao(view, segundos, consultas, segundos_sql):
+    with _lock:
+        d = _pendente.setdefault("d", _vazio())
+        _histograma(d["latencia"], view, segundos)
+        sql = d["sql"].setdefault(view, [0, 0.0])
+        sql[0] += consultas
+        sql[1] += segundos_sql
+    _flush_se_vencido()
+
+
+@contextmanager
+def medir_pdf(tipo):
+    """Mede a geração de um PDF (bloco `with`) no histograma spi_pdf_render_seconds."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _histograma(_pendente.setdefault("d", _vazio())["pdf"], tipo, time.perf_counter() - inicio)
+        # O pdf_worker não passa pelo middleware: sem isso os tempos só sairiam no atexit
+        _flush_se_vencido()
+
+
+def _ler(f):
+    f.seek(0)
+    try:
+        dados = json.loads(f.read() or "{}")
+    except ValueError:
+        dados = {}
+    return {**_vazio(), **dados}
+
+
+def flush():
+    """Soma os incrementos deste processo no arquivo compartilhado."""
+    with _lock:
+        delta = _pendente.pop("d", None)
+        _ultimo_flush[0] = time.monotonic()
+    if not delta:
+        return
+    caminho = settings.METRICAS_ARQUIVO
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        dados = _somar(_ler(f), delta)
+        f.seek(0)
+        f.truncate()
+        json.dump(dados, f)
+
+
+atexit.register(flush)
+
+
+def ler():
+    flush()
+    try:
+        with open(settings.METRICAS_ARQUIVO) as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            return _ler(f)
+    except FileNotFoundError:
+        return _vazio()
+
+
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_histograma(linhas, nome, rotulo, dados):
+    for chave, h in sorted(dados.items()):
+        acumulado = 0
+        for limite, n in zip(BUCKETS, h["buckets"]):
+            acumulado += n
+            linhas.append(f'{nome}_bucket{{{rotulo}="{_rotulo(chave)}",le="{limite}"}} {acumulado}')
+        linhas.append(f'{nome}_bucket{{{rotulo}="{_rotulo(chave)}",le="+Inf"}} {h["total"]}')
+        linhas.append(f'{nome}_sum{{{rotulo}="{_rotulo(chave)}"}} {h["soma"]:.6f}')
+        linhas.append(f'{nome}_count{{{rotulo}="{_rotulo(chave)}"}} {h["total"]}')
+
+
+def prometheus(dados):
+    """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)."""
+    linhas = [
+        "# HELP spi_request_duration_seconds Latência das requisições por view.",
+        "# TYPE spi_request_duration_seconds histogram",
+    ]
+    _formatar_histograma(linhas, "spi_request_duration_seconds", "view", dados["latencia"])
+    linhas += [
+        "# HELP spi_sql_queries_total Consultas SQL executadas por view.",
+        "# TYPE spi_sql_queries_total counter",
+    ]
+    linhas += [f'spi_sql_queries_total{{view="{_rotulo(v)}"}} {c}' for v, (c, _) in sorted(dados["sql"].items())]
+    linhas += [
+        "# HELP spi_sql_seconds_total Tempo total em consultas SQL por view.",
+        "# TYPE spi_sql_seconds_total counter",
+    ]
+    linhas += [f'spi_sql_seconds_total{{view="{_rotulo(v)}"}} {s:.6f}' for v, (_, s) in sorted(dados["sql"].items())]
+    linhas += [
+        "# HELP spi_pdf_render_seconds Tempo de geração de PDFs por tipo.",
+        "# TYPE spi_pdf_render_seconds histogram",
+    ]
+    _formatar_histograma(linhas, "spi_pdf_render_seconds", "tipo", dados["pdf"])
+    return "\n".join(linhas) + "\n"
+
+
+class _ContadorSQL:
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.segundos += time.perf_counter() - inicio
+
+
+class MetricasMiddleware:
+    """Registra latência e SQL de cada requisição pelo nome da URL resolvida."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = _ContadorSQL()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(contador):
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        registrar_requisicao(
+            match.view_name if match else SEM_ROTA,
+            time.perf_counter() - inicio,
+            contador.consultas,
+            contador.segundos,
+        )
+        return response
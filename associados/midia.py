@@ -0,0 +1,45 @@
+import mimetypes
+import os
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+from .models import Arquivo, Documento
+
+# Arquivos de MEDIA_ROOT que não podem ser públicos (documentos de identidade).
+# Em produção o Django só autoriza e devolve X-Accel-Redirect; o nginx envia o arquivo
+# da location `internal` (sendfile), sem ocupar o worker durante a transferência.
+PROTEGIDOS = ("blobs/", "documentos/")
+
+
+def caminho_seguro(nome):
+    """Caminho relativo normalizado dentro de MEDIA_ROOT, ou None se tentar sair dele."""
+    nome = posixpath.normpath(nome).lstrip("/")
+    if nome.startswith("..") or "\0" in nome:
+        return None
+    return nome
+
+
+def documento_existe(nome):
+    """O caminho pedido pertence a um Documento (blob, miniatura/prévia ou upload antigo)?"""
+    if nome.startswith("blobs/"):
+        sha = posixpath.basename(nome)[:64]
+        return len(sha) == 64 and Arquivo.objects.filter(sha256=sha).exists()
+    return Documento.objects.filter(arquivo=nome).exists()
+
+
+def enviar(nome, content_type=None, filename=None, cache_control="private, no-cache"):
+    """Resposta que entrega MEDIA_ROOT/<nome>: X-Accel-Redirect com MEDIA_X_ACCEL, senão FileResponse."""
+    content_type = content_type or mimetypes.guess_type(nome)[0] or "application/octet-stream"
+    if settings.MEDIA_X_ACCEL:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_X_ACCEL_PREFIX + quote(nome)
+        if filename:
+            response["Content-Disposition"] = f'inline; filename="{filename}"'
+    else:
+        path = os.path.join(settings.MEDIA_ROOT, nome)
+        response = FileResponse(open(path, "rb"), content_type=content_type, filename=filename or "")
+    response["Cache-Control"] = cache_control
+    return response
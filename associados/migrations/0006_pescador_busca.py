@@ -0,0 +1,40 @@
+# Generated by Django 4.2.25 on 2026-10-17 05:50
+
+from django.db import migrations, models
+
+from associados.search import chave_busca, instalar_indice, remover_indice
+
+
+def preencher_busca(apps, schema_editor):
+    Pescador = apps.get_model("associados", "Pescador")
+    for p in Pescador.objects.all().iterator():
+        Pescador.objects.filter(pk=p.pk).update(busca=chave_busca(p.nome, p.cpf, p.rgp))
+
+
+def criar_indice_busca(apps, schema_editor):
+    instalar_indice(schema_editor)
+
+
+def remover_indice_busca(apps, schema_editor):
+    remover_indice(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0005_caixalancamento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pescador',
+            name='busca',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='pescador',
+            index=models.Index(fields=['nome', 'id'], name='pescador_nome_id_idx'),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:01
+
+from django.db import migrations, models
+
+
+def criar_sequencia_recibo(apps, schema_editor):
+    # Começa do maior número já emitido
+    Mensalidade = apps.get_model("associados", "Mensalidade")
+    Sequencia = apps.get_model("associados", "Sequencia")
+    ultimo = Mensalidade.objects.aggregate(m=models.Max("recibo_numero"))["m"] or 0
+    Sequencia.objects.update_or_create(nome="recibo", defaults={"valor": ultimo})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0007_pdfjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=50, unique=True)),
+                ('valor', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(criar_sequencia_recibo, migrations.RunPython.noop),
+    ]
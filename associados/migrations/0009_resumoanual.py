@@ -0,0 +1,65 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:03
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractYear
+import django.db.models.deletion
+
+
+def preencher_resumos(apps, schema_editor):
+    Mensalidade = apps.get_model("associados", "Mensalidade")
+    ResumoAnual = apps.get_model("associados", "ResumoAnual")
+    agregados = (
+        Mensalidade.objects.annotate(ano_comp=ExtractYear("competencia"))
+        .values("pescador_id", "ano_comp")
+        .annotate(
+            pagas=models.Count("pk", filter=models.Q(status="pago")),
+            pendentes=models.Count("pk", filter=models.Q(status="pendente")),
+            isentas=models.Count("pk", filter=models.Q(status="isento")),
+            valor_pago=models.Sum("valor", filter=models.Q(status="pago")),
+        )
+        .order_by()
+    )
+    ResumoAnual.objects.bulk_create(
+        [
+            ResumoAnual(
+                pescador_id=a["pescador_id"],
+                ano=a["ano_comp"],
+                pagas=a["pagas"],
+                pendentes=a["pendentes"],
+                isentas=a["isentas"],
+                valor_pago=a["valor_pago"] or 0,
+            )
+            for a in agregados
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0008_sequencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoAnual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.PositiveSmallIntegerField()),
+                ('pagas', models.PositiveSmallIntegerField(default=0)),
+                ('pendentes', models.PositiveSmallIntegerField(default=0)),
+                ('isentas', models.PositiveSmallIntegerField(default=0)),
+                ('valor_pago', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('pescador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos', to='associados.pescador')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ano', 'pagas'], name='resumo_ano_pagas_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resumoanual',
+            constraint=models.UniqueConstraint(fields=('pescador', 'ano'), name='resumo_pescador_ano_uniq'),
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
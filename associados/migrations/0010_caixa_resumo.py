@@ -0,0 +1,73 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:05
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def preencher_caixa(apps, schema_editor):
+    CaixaLancamento = apps.get_model("associados", "CaixaLancamento")
+    CaixaResumoMensal = apps.get_model("associados", "CaixaResumoMensal")
+    CaixaSaldoMensal = apps.get_model("associados", "CaixaSaldoMensal")
+    linhas = list(
+        CaixaLancamento.objects.annotate(mes=TruncMonth("data"))
+        .values("mes", "tipo", "categoria")
+        .annotate(total=models.Sum("valor"), quantidade=models.Count("pk"))
+        .order_by("mes")
+    )
+    CaixaResumoMensal.objects.bulk_create([CaixaResumoMensal(**l) for l in linhas], batch_size=1000)
+    saldos = {}
+    for l in linhas:
+        receitas, despesas = saldos.get(l["mes"], (0, 0))
+        if l["tipo"] == "receita":
+            receitas += l["total"]
+        else:
+            despesas += l["total"]
+        saldos[l["mes"]] = (receitas, despesas)
+    acumulado, objs = 0, []
+    for mes in sorted(saldos):
+        receitas, despesas = saldos[mes]
+        acumulado += receitas - despesas
+        objs.append(CaixaSaldoMensal(mes=mes, receitas=receitas, despesas=despesas, saldo_final=acumulado))
+    CaixaSaldoMensal.objects.bulk_create(objs, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0009_resumoanual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaixaResumoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês')),
+                ('tipo', models.CharField(choices=[('receita', 'Receita'), ('despesa', 'Despesa')], max_length=10)),
+                ('categoria', models.CharField(max_length=100)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantidade', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['mes', 'tipo', 'categoria'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CaixaSaldoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês', unique=True)),
+                ('receitas', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('despesas', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('saldo_final', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['mes'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='caixaresumomensal',
+            constraint=models.UniqueConstraint(fields=('mes', 'tipo', 'categoria'), name='caixa_resumo_mes_tipo_cat_uniq'),
+        ),
+        migrations.RunPython(preencher_caixa, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0010_caixa_resumo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='caixalancamento',
+            index=models.Index(fields=['data', 'criado_em', 'id'], name='caixa_data_criado_id_idx'),
+        ),
+    ]
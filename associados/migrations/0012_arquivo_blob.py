@@ -0,0 +1,35 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0011_caixa_extrato_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Arquivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('arquivo', models.FileField(max_length=200, upload_to='')),
+                ('tamanho', models.PositiveBigIntegerField(default=0)),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='documento',
+            name='arquivo',
+            field=models.FileField(max_length=200, upload_to='documentos/'),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documentos', to='associados.arquivo'),
+        ),
+    ]
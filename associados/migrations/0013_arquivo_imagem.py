@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0012_arquivo_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arquivo',
+            name='imagem',
+            field=models.BooleanField(default=False),
+        ),
+    ]
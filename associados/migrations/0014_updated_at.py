@@ -0,0 +1,46 @@
+# Generated by Django 4.2.25 on 2026-10-17 06:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+from associados.search import instalar_indice
+
+
+def reinstalar_indice_busca(apps, schema_editor):
+    # No SQLite o AddField em Pescador recria a tabela e derruba os triggers do FTS5
+    instalar_indice(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0013_arquivo_imagem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='associacaoconfig',
+            name='updated_at',
+            preserve_default=False,
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='updated_at',
+            preserve_default=False,
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='mensalidade',
+            name='updated_at',
+            preserve_default=False,
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='pescador',
+            name='updated_at',
+            preserve_default=False,
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(reinstalar_indice_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from associados.search import chave_busca
+
+
+def recalcular_busca(apps, schema_editor):
+    # A chave passou a incluir o RGP normalizado (com letras); o trigger do FTS5 acompanha o UPDATE
+    Pescador = apps.get_model("associados", "Pescador")
+    for p in Pescador.objects.only("id", "nome", "cpf", "rgp", "busca").iterator(chunk_size=2000):
+        chave = chave_busca(p.nome, p.cpf, p.rgp)
+        if chave != p.busca:
+            Pescador.objects.filter(pk=p.pk).update(busca=chave)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('associados', '0015_carimbo'),
+    ]
+
+    operations = [
+        migrations.RunPython(recalcular_busca, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
+import os
+from datetime import date
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import ExtractYear, TruncMonth
 from django.utils import timezone
 
 
@@ -13,13 +17,27 @@ class Pescador(models.Model):
     telefone = models.CharField(max_length=20, blank=True)
     seguro_defeso_pedido = models.BooleanField(default=False)
     data_associacao = models.DateField(default=timezone.now)
+    # Chave normalizada para busca (sem acentos, CPF/RGP só dígitos, RGP com letras também
+    # normalizado); indexada via FTS5/trigram
+    busca = models.CharField(max_length=255, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["nome"]
+        indexes = [models.Index(fields=["nome", "id"], name="pescador_nome_id_idx")]
 
     def __str__(self):
         return f"{self.nome} ({self.cpf})"
 
+    def save(self, *args, **kwargs):
+        from .search import chave_busca
+
+        self.busca = chave_busca(self.nome, self.cpf, self.rgp)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "busca" not in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["busca"]
+        super().save(*args, **kwargs)
+
 
 class Endereco(models.Model):
     pescador = models.OneToOneField(Pescador, on_delete=models.CASCADE, related_name="endereco")
@@ -35,6 +53,33 @@ class Endereco(models.Model):
         return f"{self.logradouro}, {self.numero} - {self.bairro} - {self.cidade}/{self.estado}"
 
 
+class Arquivo(models.Model):
+    """Conteúdo de um documento, gravado uma vez por SHA-256 (ver associados/armazenamento.py)."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    arquivo = models.FileField(max_length=200)
+    tamanho = models.PositiveBigIntegerField(default=0)
+    referencias = models.PositiveIntegerField(default=0)
+    # Imagem com miniatura e prévia geradas ao lado do arquivo (associados/imagens.py)
+    imagem = models.BooleanField(default=False)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.referencias} ref.)"
+
+    def _url_derivado(self, tipo):
+        from .imagens import nome_derivado
+
+        return self.arquivo.storage.url(nome_derivado(self.arquivo.name, tipo)) if self.imagem else None
+
+    @property
+    def miniatura_url(self):
+        return self._url_derivado("miniatura")
+
+    @property
+    def previa_url(self):
+        return self._url_derivado("previa")
+
+
 class Documento(models.Model):
     TIPO_CHOICES = [
         ("RG", "RG"),
@@ -46,9 +91,12 @@ class Documento(models.Model):
     ]
     pescador = models.ForeignKey(Pescador, on_delete=models.CASCADE, related_name="documentos")
     tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
-    arquivo = models.FileField(upload_to="documentos/")
+    arquivo = models.FileField(upload_to="documentos/", max_length=200)
+    # Conteúdo deduplicado; `arquivo` aponta para o mesmo caminho do blob
+    blob = models.ForeignKey(Arquivo, on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name="documentos")
     observacao = models.CharField(max_length=255, blank=True)
     data_upload = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-data_upload"]
@@ -56,6 +104,33 @@ class Documento(models.Model):
     def __str__(self):
         return f"{self.pescador.nome} - {self.tipo}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._blob_original = obj.__dict__.get("blob_id")
+        return obj
+
+    def save(self, *args, **kwargs):
+        from . import imagens
+        from .armazenamento import armazenar, liberar
+
+        with transaction.atomic():
+            if self.arquivo and not self.arquivo._committed:
+                # Upload novo: fotos são normalizadas (orientação, tamanho, JPEG) e o resultado
+                # é gravado por conteúdo em vez de documentos/<nome do cliente>
+                conteudo, nome = self.arquivo.file, self.arquivo.name
+                normalizado = imagens.normalizar(conteudo)
+                if normalizado is not None:
+                    conteudo, nome = normalizado, os.path.splitext(nome)[0] + ".jpg"
+                self.blob = armazenar(conteudo, nome)
+                self.arquivo.name = self.blob.arquivo.name
+                self.arquivo._committed = True
+            super().save(*args, **kwargs)
+            anterior = getattr(self, "_blob_original", None)
+            if anterior and anterior != self.blob_id:
+                liberar(anterior)
+            self._blob_original = self.blob_id
+
 
 class Mensalidade(models.Model):
     STATUS_CHOICES = [
@@ -72,6 +147,7 @@ class Mensalidade(models.Model):
     observacao = models.CharField(max_length=255, blank=True)
     recibo_numero = models.PositiveIntegerField(blank=True, null=True, unique=True)
     recibo_token = models.CharField(max_length=40, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("pescador", "competencia")
@@ -81,6 +157,153 @@ class Mensalidade(models.Model):
         comp = self.competencia.strftime("%m/%Y") if self.competencia else ""
         return f"{self.pescador.nome} - {comp} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._resumo_original = obj._chave_resumo()
+        return obj
+
+    def _chave_resumo(self):
+        if self.pescador_id and self.competencia:
+            return (self.pescador_id, self.competencia.year)
+        return None
+
+    def _atualizar_resumos(self):
+        chaves = {self._chave_resumo(), getattr(self, "_resumo_original", None)} - {None}
+        for pescador_id, ano in chaves:
+            ResumoAnual.recalcular([pescador_id], [ano])
+        self._resumo_original = self._chave_resumo()
+
+    def save(self, *args, **kwargs):
+        # Resumo anual atualizado na mesma transação da mensalidade
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._atualizar_resumos()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._atualizar_resumos()
+        return result
+
+
+class ResumoAnual(models.Model):
+    """Totais de mensalidades por (pescador, ano), mantidos por Mensalidade.save()/delete().
+
+    Operações em massa (bulk_create, QuerySet.update/delete) devem chamar ResumoAnual.recalcular();
+    o comando recalcular_resumos reconstrói a tabela inteira.
+    """
+    pescador = models.ForeignKey(Pescador, on_delete=models.CASCADE, related_name="resumos")
+    ano = models.PositiveSmallIntegerField()
+    pagas = models.PositiveSmallIntegerField(default=0)
+    pendentes = models.PositiveSmallIntegerField(default=0)
+    isentas = models.PositiveSmallIntegerField(default=0)
+    valor_pago = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["pescador", "ano"], name="resumo_pescador_ano_uniq")]
+        indexes = [models.Index(fields=["ano", "pagas"], name="resumo_ano_pagas_idx")]
+
+    def __str__(self):
+        return f"{self.pescador_id}/{self.ano}: {self.pagas} pagas"
+
+    @property
+    def defeso_pode(self):
+        return self.pagas >= 12
+
+    @classmethod
+    def recalcular(cls, pescador_ids, anos):
+        """Recalcula os resumos de todos os pares (pescador, ano) informados em uma consulta agregada.
+
+        As linhas dos pares são criadas (se faltarem) e travadas com select_for_update antes da
+        agregação: recálculos simultâneos do mesmo pescador/ano rodam em série e o último grava
+        os totais que já incluem as mensalidades do primeiro.
+        """
+        pescador_ids, anos = list(pescador_ids), sorted(set(anos))
+        if not pescador_ids or not anos:
+            return
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(pescador_id=p, ano=ano) for p in pescador_ids for ano in anos],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            list(
+                cls.objects.select_for_update()
+                .filter(pescador_id__in=pescador_ids, ano__in=anos)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            agregados = (
+                Mensalidade.objects.filter(
+                    pescador_id__in=pescador_ids,
+                    competencia__gte=date(anos[0], 1, 1),
+                    competencia__lt=date(anos[-1] + 1, 1, 1),
+                )
+                .annotate(ano_comp=ExtractYear("competencia"))
+                .values("pescador_id", "ano_comp")
+                .annotate(**cls._agregados())
+            )
+            por_chave = {(a["pescador_id"], a["ano_comp"]): a for a in agregados}
+            resumos = []
+            for pescador_id in pescador_ids:
+                for ano in anos:
+                    a = por_chave.get((pescador_id, ano), {})
+                    resumos.append(cls(
+                        pescador_id=pescador_id,
+                        ano=ano,
+                        pagas=a.get("pagas", 0),
+                        pendentes=a.get("pendentes", 0),
+                        isentas=a.get("isentas", 0),
+                        valor_pago=a.get("valor_pago") or 0,
+                    ))
+            cls.objects.bulk_create(
+                resumos,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["pescador", "ano"],
+                update_fields=["pagas", "pendentes", "isentas", "valor_pago"],
+            )
+
+    @classmethod
+    def reconstruir(cls):
+        """Apaga e recria todos os resumos a partir das mensalidades. Retorna o total de linhas."""
+        agregados = (
+            Mensalidade.objects.annotate(ano_comp=ExtractYear("competencia"))
+            .values("pescador_id", "ano_comp")
+            .annotate(**cls._agregados())
+            .order_by()
+        )
+        total = 0
+        with transaction.atomic():
+            cls.objects.all().delete()
+            lote = []
+            for a in agregados.iterator(chunk_size=2000):
+                lote.append(cls(
+                    pescador_id=a["pescador_id"],
+                    ano=a["ano_comp"],
+                    pagas=a["pagas"],
+                    pendentes=a["pendentes"],
+                    isentas=a["isentas"],
+                    valor_pago=a["valor_pago"] or 0,
+                ))
+                if len(lote) >= 1000:
+                    cls.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            cls.objects.bulk_create(lote)
+            total += len(lote)
+        return total
+
+    @staticmethod
+    def _agregados():
+        return {
+            "pagas": models.Count("pk", filter=models.Q(status="pago")),
+            "pendentes": models.Count("pk", filter=models.Q(status="pendente")),
+            "isentas": models.Count("pk", filter=models.Q(status="isento")),
+            "valor_pago": models.Sum("valor", filter=models.Q(status="pago")),
+        }
+
 
 class AssociacaoConfig(models.Model):
     nome = models.CharField(max_length=200, default="Sistema do Pescador de Ipixuna")
@@ -95,6 +318,7 @@ class AssociacaoConfig(models.Model):
     estado = models.CharField(max_length=2, blank=True)
     cep = models.CharField(max_length=9, blank=True)
     valor_mensalidade_padrao = models.DecimalField(max_digits=8, decimal_places=2, default=getattr(settings, "DEFAULT_MENSALIDADE", 25.00))
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Configuração da Associação"
@@ -108,6 +332,51 @@ class AssociacaoConfig(models.Model):
         obj, _ = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def get_cached(cls):
+        """Versão somente leitura de get_solo(), em cache por worker e invalidada no post_save."""
+        from .cache import get_config
+
+        return get_config()
+
+
+class Sequencia(models.Model):
+    """Contador nomeado (ex.: número de recibo), uma linha por sequência."""
+    nome = models.CharField(max_length=50, unique=True)
+    valor = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.nome}: {self.valor}"
+
+    @classmethod
+    def reservar(cls, nome, quantidade=1):
+        """Reserva `quantidade` números consecutivos e retorna o range reservado.
+
+        O UPDATE valor = valor + n trava a linha (Postgres) ou o banco (SQLite) até o fim da
+        transação, então caixas concorrentes nunca recebem o mesmo número. Se a transação
+        externa for desfeita, os números voltam para a sequência.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(nome=nome).update(valor=models.F("valor") + quantidade):
+                cls.objects.get_or_create(nome=nome)
+                cls.objects.filter(nome=nome).update(valor=models.F("valor") + quantidade)
+            fim = cls.objects.filter(nome=nome).values_list("valor", flat=True).get()
+        return range(fim - quantidade + 1, fim + 1)
+
+    @classmethod
+    def proximo(cls, nome):
+        return cls.reservar(nome, 1)[0]
+
+
+class Carimbo(models.Model):
+    """Impressão digital gravada por etapa de inicialização (ex.: migrações), ver associados/inicio.py."""
+    nome = models.CharField(max_length=50, unique=True)
+    valor = models.CharField(max_length=64)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nome}: {self.valor[:12]}"
+
 
 class CaixaLancamento(models.Model):
     TIPO_CHOICES = (
@@ -123,6 +392,177 @@ class CaixaLancamento(models.Model):
 
     class Meta:
         ordering = ['-data', '-criado_em']
+        indexes = [
+            models.Index(fields=["data", "criado_em", "id"], name="caixa_data_criado_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.get_tipo_display()} {self.categoria} - R$ {self.valor} em {self.data}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._mes_original = obj.data.replace(day=1) if obj.data else None
+        return obj
+
+    def _atualizar_resumos(self):
+        meses = {self.data.replace(day=1) if self.data else None, getattr(self, "_mes_original", None)} - {None}
+        CaixaSaldoMensal.recalcular(meses)
+        self._mes_original = self.data.replace(day=1) if self.data else None
+
+    def save(self, *args, **kwargs):
+        # Resumo mensal e saldo acumulado atualizados na mesma transação do lançamento
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._atualizar_resumos()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._atualizar_resumos()
+        return result
+
+
+class CaixaResumoMensal(models.Model):
+    """Total do Caixa por (mês, tipo, categoria), mantido por CaixaLancamento.save()/delete()."""
+    mes = models.DateField(help_text="Primeiro dia do mês")
+    tipo = models.CharField(max_length=10, choices=CaixaLancamento.TIPO_CHOICES)
+    categoria = models.CharField(max_length=100)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantidade = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["mes", "tipo", "categoria"]
+        constraints = [
+            models.UniqueConstraint(fields=["mes", "tipo", "categoria"], name="caixa_resumo_mes_tipo_cat_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%m/%Y} {self.tipo} {self.categoria}: {self.total}"
+
+
+class CaixaSaldoMensal(models.Model):
+    """Receitas, despesas e saldo acumulado (saldo de fechamento) de cada mês do Caixa."""
+    mes = models.DateField(unique=True, help_text="Primeiro dia do mês")
+    receitas = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    despesas = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    saldo_final = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["mes"]
+
+    def __str__(self):
+        return f"{self.mes:%m/%Y}: saldo {self.saldo_final}"
+
+    @property
+    def saldo(self):
+        return self.receitas - self.despesas
+
+    @classmethod
+    def saldo_em(cls, mes):
+        """Saldo acumulado no fechamento de `mes` (ou do último mês com movimento antes dele)."""
+        valor = cls.objects.filter(mes__lte=mes).order_by("-mes").values_list("saldo_final", flat=True).first()
+        return valor or 0
+
+    @classmethod
+    def recalcular(cls, meses):
+        """Recalcula o resumo por categoria dos meses informados e propaga a diferença de saldo
+        para os meses seguintes (um UPDATE).
+
+        A linha do mês fica travada (select_for_update) do cálculo até o commit: dois lançamentos
+        simultâneos no mesmo mês recalculam um depois do outro em vez de apagar e reinserir os
+        mesmos resumos ao mesmo tempo.
+        """
+        for mes in sorted(meses):
+            with transaction.atomic():
+                cls.objects.get_or_create(mes=mes)
+                atual = cls.objects.select_for_update().get(mes=mes)
+                fim = date(mes.year + 1, 1, 1) if mes.month == 12 else date(mes.year, mes.month + 1, 1)
+                linhas = list(
+                    CaixaLancamento.objects.filter(data__gte=mes, data__lt=fim)
+                    .values("tipo", "categoria")
+                    .annotate(total=models.Sum("valor"), quantidade=models.Count("pk"))
+                    .order_by()
+                )
+                CaixaResumoMensal.objects.filter(mes=mes).delete()
+                CaixaResumoMensal.objects.bulk_create([CaixaResumoMensal(mes=mes, **linha) for linha in linhas])
+
+                receitas = sum((l["total"] for l in linhas if l["tipo"] == "receita"), 0)
+                despesas = sum((l["total"] for l in linhas if l["tipo"] == "despesa"), 0)
+                delta = (receitas - despesas) - atual.saldo
+                if not linhas:
+                    # Mês sem movimento não tem linha de saldo (como em reconstruir()); os seguintes
+                    # perdem o saldo que ele tinha
+                    atual.delete()
+                    if delta:
+                        cls.objects.filter(mes__gt=mes).update(saldo_final=models.F("saldo_final") + delta)
+                    continue
+                anterior = cls.saldo_em(date(mes.year - 1, 12, 1) if mes.month == 1 else date(mes.year, mes.month - 1, 1))
+                atual.receitas, atual.despesas = receitas, despesas
+                atual.saldo_final = anterior + receitas - despesas
+                atual.save(update_fields=["receitas", "despesas", "saldo_final"])
+                if delta:
+                    cls.objects.filter(mes__gt=mes).update(saldo_final=models.F("saldo_final") + delta)
+
+    @classmethod
+    def reconstruir(cls):
+        """Apaga e recria os resumos mensais e saldos a partir de todos os lançamentos."""
+        linhas = (
+            CaixaLancamento.objects.annotate(mes=TruncMonth("data"))
+            .values("mes", "tipo", "categoria")
+            .annotate(total=models.Sum("valor"), quantidade=models.Count("pk"))
+            .order_by("mes")
+        )
+        with transaction.atomic():
+            CaixaResumoMensal.objects.all().delete()
+            cls.objects.all().delete()
+            resumos, saldos = [], {}
+            for l in linhas.iterator(chunk_size=2000):
+                resumos.append(CaixaResumoMensal(**l))
+                s = saldos.setdefault(l["mes"], cls(mes=l["mes"]))
+                if l["tipo"] == "receita":
+                    s.receitas += l["total"]
+                else:
+                    s.despesas += l["total"]
+            acumulado = 0
+            for mes in sorted(saldos):
+                acumulado += saldos[mes].saldo
+                saldos[mes].saldo_final = acumulado
+            CaixaResumoMensal.objects.bulk_create(resumos, batch_size=1000)
+            cls.objects.bulk_create(saldos.values(), batch_size=1000)
+        return len(resumos), len(saldos)
+
+
+class PdfJob(models.Model):
+    """PDF (recibo/dossiê) a ser gerado fora da requisição pelo comando pdf_worker.
+
+    `chave` é o hash das entradas (estado da mensalidade/documentos + versão da configuração);
+    o arquivo fica em MEDIA_ROOT/pdf_cache/ com esse nome e é reaproveitado enquanto a chave valer.
+    """
+    TIPO_CHOICES = (
+        ("recibo", "Recibo"),
+        ("dossie", "Dossiê do Defeso"),
+    )
+    STATUS_CHOICES = (
+        ("pendente", "Pendente"),
+        ("processando", "Processando"),
+        ("pronto", "Pronto"),
+        ("erro", "Erro"),
+    )
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    objeto_id = models.PositiveBigIntegerField()
+    chave = models.CharField(max_length=64, unique=True)
+    base_url = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default="pendente")
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(blank=True, null=True)
+    concluido_em = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["criado_em"]
+        indexes = [models.Index(fields=["status", "criado_em"], name="pdfjob_status_idx")]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id} ({self.status})"
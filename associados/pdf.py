@@ -0,0 +1,317 @@
+from datetime import date
+from functools import lru_cache
+
+from django.urls import reverse
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+import qrcode
+
+from . import pdf_assets
+from .models import Mensalidade, ResumoAnual
+
+# Renderização dos PDFs (recibos e dossiês). Importe sob demanda (`from . import pdf` dentro da
+# função, como em jobs.renderizar): ReportLab, qrcode e PIL só entram no processo que gera PDF.
+RECIBO_W = 500
+RECIBO_H = 460
+
+REQUIRED_DOCS = [
+    ("RG", "RG"),
+    ("CPF", "CPF"),
+    ("RGP", "RGP"),
+    ("COMPROVANTE_ENDERECO", "Comprovante de Endereço"),
+]
+
+
+def brl(value):
+    try:
+        v = float(value)
+    except Exception:
+        return f"R$ {value}"
+    s = f"{v:,.2f}"
+    return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def recibo_verify_url(base_url, mensalidade):
+    """URL gravada no QR Code do recibo (página pública de verificação).
+
+    `base_url` é o esquema+host, sem barra final.
+    """
+    if mensalidade.recibo_numero and mensalidade.recibo_token:
+        path = reverse('associados:recibo_verificar', args=[mensalidade.recibo_numero, mensalidade.recibo_token])
+    else:
+        path = reverse('associados:recibo_pdf', args=[mensalidade.pk])
+    return base_url.rstrip("/") + path
+
+
+@lru_cache(maxsize=4096)
+def qr_modulos(pk, recibo_token, verify_url):
+    """Módulos escuros do QR como retângulos (coluna, linha, largura, altura), em unidades de módulo.
+
+    Memoizado por (pk, token, url): reimprimir o mesmo recibo não recalcula o QR.
+    """
+    qr = qrcode.QRCode(border=1, error_correction=qrcode.constants.ERROR_CORRECT_M)
+    qr.add_data(verify_url)
+    qr.make(fit=True)
+    matriz = qr.get_matrix()
+    retangulos = []
+    abertos = {}  # (coluna, largura) -> [linha inicial, altura]: faixas iguais em linhas seguidas viram um retângulo
+    for linha, modulos in enumerate(matriz + [[]]):
+        faixas = set()
+        inicio = None
+        for col, escuro in enumerate(modulos + [False]):
+            if escuro and inicio is None:
+                inicio = col
+            elif not escuro and inicio is not None:
+                faixas.add((inicio, col - inicio))
+                inicio = None
+        for chave in list(abertos):
+            if chave in faixas:
+                abertos[chave][1] += 1
+            else:
+                topo, altura = abertos.pop(chave)
+                retangulos.append((chave[0], topo, chave[1], altura))
+        for chave in faixas - abertos.keys():
+            abertos[chave] = [linha, 1]
+    return len(matriz), tuple(retangulos)
+
+
+def desenhar_qr(p, modulos, x, y, tamanho):
+    """Desenha o QR como vetor (um único path preenchido) no quadrado tamanho x tamanho a partir de (x, y)."""
+    n, retangulos = modulos
+    m = tamanho / n
+    p.saveState()
+    p.setFillColorRGB(1, 1, 1)
+    p.rect(x, y, tamanho, tamanho, stroke=0, fill=1)
+    p.setFillColorRGB(0, 0, 0)
+    # Coordenadas inteiras em unidades de módulo, com a linha 0 no topo: operadores curtos no PDF
+    p.translate(x, y + tamanho)
+    p.scale(m, -m)
+    path = p.beginPath()
+    for col, linha, largura, altura in retangulos:
+        path.rect(col, linha, largura, altura)
+    p.drawPath(path, stroke=0, fill=1)
+    p.restoreState()
+
+
+def desenhar_recibo(p, mensalidade, config, verify_url, box_x, box_y):
+    """Desenha um recibo com a caixa (RECIBO_W x RECIBO_H) a partir de (box_x, box_y)."""
+    box_w = RECIBO_W
+    box_h = RECIBO_H
+    p.setLineWidth(1)
+    p.roundRect(box_x, box_y, box_w, box_h, 8)
+
+    # Cabeçalho da associação (centralizado)
+    head_y = box_y + box_h - 30
+    logo = pdf_assets.get_image(config, "logo")
+    if logo:
+        dw, dh = logo.fit(90, 50)
+        p.drawImage(logo.reader, box_x + box_w - dw - 16, head_y - dh + 10, dw, dh, preserveAspectRatio=True)
+    p.setFont("Helvetica-Bold", 14)
+    assoc = (config.nome or "Associação").upper()
+    tw = p.stringWidth(assoc, "Helvetica-Bold", 14)
+    p.drawString(box_x + (box_w - tw) / 2, head_y, assoc)
+    p.setFont("Helvetica", 9)
+    info1 = f"CNPJ: {config.cnpj or '-'}  |  Tel: {config.telefone or '-'}  |  Email: {config.email or '-'}"
+    tw1 = p.stringWidth(info1, "Helvetica", 9)
+    p.drawString(box_x + (box_w - tw1) / 2, head_y - 14, info1)
+    info2 = f"End.: {config.endereco or '-'} - {config.cidade or ''}/{config.estado or ''} {config.cep or ''}"
+    tw2 = p.stringWidth(info2, "Helvetica", 9)
+    p.drawString(box_x + (box_w - tw2) / 2, head_y - 28, info2)
+
+    # Título do recibo
+    p.setFont("Helvetica-Bold", 16)
+    num_txt = f" Nº {mensalidade.recibo_numero}" if mensalidade.recibo_numero else ""
+    title = f"RECIBO DE PAGAMENTO{num_txt}"
+    twt = p.stringWidth(title, "Helvetica-Bold", 16)
+    p.drawString(box_x + (box_w - twt) / 2, head_y - 56, title)
+
+    # Conteúdo (labels e valores)
+    left = box_x + 24
+    right = box_x + box_w - 24
+    y = head_y - 86
+    label_font = ("Helvetica-Bold", 11)
+    value_font = ("Helvetica", 11)
+
+    def draw_row(label, value):
+        nonlocal y
+        p.setFont(*label_font)
+        p.drawString(left, y, label)
+        p.setFont(*value_font)
+        p.drawString(left + 150, y, value)
+        y -= 20
+
+    comp = mensalidade.competencia.strftime("%m/%Y")
+    draw_row("Recebemos de:", f"{mensalidade.pescador.nome}")
+    draw_row("CPF:", f"{mensalidade.pescador.cpf}")
+    draw_row("RGP:", f"{mensalidade.pescador.rgp}")
+    draw_row("Competência:", comp)
+    draw_row("Valor:", brl(mensalidade.valor))
+    draw_row("Data do pagamento:", mensalidade.data_pagamento.strftime('%d/%m/%Y'))
+    if mensalidade.forma_pagamento:
+        draw_row("Forma de pagamento:", mensalidade.forma_pagamento)
+    if mensalidade.observacao:
+        draw_row("Observações:", mensalidade.observacao)
+
+    # QR Code (canto inferior direito da caixa)
+    desenhar_qr(p, qr_modulos(mensalidade.pk, mensalidade.recibo_token, verify_url), right - 80, box_y + 24, 64)
+
+    # Assinatura (centralizada)
+    sig_y = box_y + 120
+    line_w = 220
+    cx = box_x + box_w / 2
+    p.line(cx - line_w / 2, sig_y, cx + line_w / 2, sig_y)
+    p.setFont("Helvetica", 10)
+    assinatura = "Assinatura do responsável"
+    if config.presidente:
+        assinatura = f"{config.presidente} - Presidente"
+    tws = p.stringWidth(assinatura, "Helvetica", 10)
+    p.drawString(cx - tws / 2, sig_y - 12, assinatura)
+    assinatura_img = pdf_assets.get_image(config, "assinatura_presidente")
+    if assinatura_img:
+        p.drawImage(assinatura_img.reader, cx - 60, sig_y + 6, 120, 36, preserveAspectRatio=True)
+
+    # Linha de autenticidade e data (centralizadas)
+    p.setFont("Helvetica", 9)
+    auth = f"Recibo Nº {mensalidade.recibo_numero or '-'} • Token {mensalidade.recibo_token or '-'}"
+    twa = p.stringWidth(auth, "Helvetica", 9)
+    p.drawString(cx - twa / 2, box_y + 96, auth)
+    emit = f"Emitido em {date.today().strftime('%d/%m/%Y')}"
+    twe = p.stringWidth(emit, "Helvetica", 9)
+    p.drawString(cx - twe / 2, box_y + 82, emit)
+
+
+def render_recibos(out, mensalidades, config, url_for, por_pagina=1):
+    """Escreve em `out` um PDF com um recibo por página (ou 2 por folha A4 com por_pagina=2).
+
+    `mensalidades` pode ser um iterador (ex.: QuerySet.iterator()); `url_for(m)` gera a URL do QR.
+    """
+    p = canvas.Canvas(out, pagesize=A4, pageCompression=1)
+    width, height = A4
+    if por_pagina == 2:
+        # Duas caixas reduzidas, uma em cada metade da folha
+        escala = 0.85
+        w, h = RECIBO_W * escala, RECIBO_H * escala
+        x = (width - w) / 2
+        margem = (height / 2 - h) / 2
+        posicoes = [(x, height / 2 + margem), (x, margem)]
+    else:
+        escala = 1
+        posicoes = [((width - RECIBO_W) / 2, height - 80 - RECIBO_H)]
+
+    n = 0
+    for m in mensalidades:
+        x, y = posicoes[n % len(posicoes)]
+        p.saveState()
+        p.translate(x, y)
+        p.scale(escala, escala)
+        desenhar_recibo(p, m, config, url_for(m), 0, 0)
+        p.restoreState()
+        n += 1
+        if n % len(posicoes) == 0:
+            p.showPage()
+    if n == 0 or n % len(posicoes):
+        p.showPage()
+    p.save()
+    return n
+
+
+def render_dossie(out, pescador, config, ano):
+    """Escreve em `out` o Dossiê do Defeso do pescador para o ano informado."""
+    # Checklist de mensalidades: ano corrente, 12 pagas
+    resumo = ResumoAnual.objects.filter(pescador=pescador, ano=ano).first()
+    pagas_ano = resumo.pagas if resumo else 0
+    mensalidades_ok = pagas_ano >= 12
+
+    # Checklist de documentos obrigatórios
+    docs = pescador.documentos.all()
+    docs_por_tipo = {d.tipo: d for d in docs}
+    docs_check = []
+    for cod, nome in REQUIRED_DOCS:
+        docs_check.append({
+            "codigo": cod,
+            "nome": nome,
+            "ok": cod in docs_por_tipo,
+            "doc": docs_por_tipo.get(cod),
+        })
+    docs_ok = all(item["ok"] for item in docs_check)
+
+    # PDF
+    p = canvas.Canvas(out, pagesize=A4)
+    width, height = A4
+
+    # Capa com logo e associação
+    p.setLineWidth(1)
+    p.rect(40, height - 140, width - 80, 90)
+    logo = pdf_assets.get_image(config, "logo")
+    if logo:
+        dw, dh = logo.fit(110, 70)
+        p.drawImage(logo.reader, width - 60 - dw, height - 60 - dh, dw, dh, preserveAspectRatio=True)
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(50, height - 70, config.nome or "Associação")
+    p.setFont("Helvetica", 11)
+    p.drawString(50, height - 90, f"Presidente: {config.presidente or '-'}")
+    p.drawString(50, height - 105, f"CNPJ: {config.cnpj or '-'} | Tel: {config.telefone or '-'} | Email: {config.email or '-'}")
+
+    # Título
+    p.setFont("Helvetica-Bold", 18)
+    title = "DOSSIÊ DO SEGURO DEFESO"
+    tw = p.stringWidth(title, "Helvetica-Bold", 18)
+    p.drawString((width - tw) / 2, height - 170, title)
+
+    # Identificação do pescador
+    p.setFont("Helvetica", 12)
+    y = height - 200
+    p.drawString(50, y, f"Pescador: {pescador.nome}")
+    y -= 18
+    p.drawString(50, y, f"CPF: {pescador.cpf}   RGP: {pescador.rgp}")
+    y -= 18
+    p.drawString(50, y, f"Data de Associação: {pescador.data_associacao.strftime('%d/%m/%Y')}")
+
+    # Checklist resumo
+    y -= 28
+    p.setFont("Helvetica-Bold", 13)
+    p.drawString(50, y, "Checklist")
+    y -= 20
+    p.setFont("Helvetica", 12)
+    p.drawString(60, y, f"Mensalidades pagas em {ano}: {pagas_ano}/12 - {'OK' if mensalidades_ok else 'PENDENTE'}")
+    y -= 18
+    p.drawString(60, y, f"Documentos obrigatórios: {'OK' if docs_ok else 'PENDENTE'}")
+
+    # Documentos
+    y -= 28
+    p.setFont("Helvetica-Bold", 13)
+    p.drawString(50, y, "Documentos Obrigatórios")
+    p.setFont("Helvetica", 12)
+    y -= 18
+    for item in docs_check:
+        status = "OK" if item["ok"] else "FALTANDO"
+        txt = f"- {item['nome']}: {status}"
+        if item["ok"] and item["doc"]:
+            txt += f" (enviado em {item['doc'].data_upload.strftime('%d/%m/%Y %H:%M')})"
+        p.drawString(60, y, txt)
+        y -= 16
+        if y < 80:
+            p.showPage(); y = height - 60
+
+    # Mensalidades do ano (sumário)
+    y -= 10
+    p.setFont("Helvetica-Bold", 13)
+    p.drawString(50, y, f"Mensalidades {ano}")
+    y -= 18
+    p.setFont("Helvetica", 12)
+    mens_ano = Mensalidade.objects.filter(pescador=pescador, competencia__year=ano).order_by('competencia')
+    for m in mens_ano:
+        txt = f"- {m.competencia.strftime('%m/%Y')} | {m.get_status_display()} | Valor: R$ {m.valor}"
+        if m.data_pagamento:
+            txt += f" | Pago em {m.data_pagamento.strftime('%d/%m/%Y')}"
+        p.drawString(60, y, txt)
+        y -= 16
+        if y < 80:
+            p.showPage(); y = height - 60
+
+    # Rodapé
+    p.setFont("Helvetica", 9)
+    p.drawRightString(width - 50, 50, f"Emitido em {date.today().strftime('%d/%m/%Y')}")
+
+    p.showPage()
+    p.save()
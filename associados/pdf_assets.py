@@ -0,0 +1,106 @@
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+
+# Imagens da associação (logo/assinatura) já preparadas para o PDF: orientação corrigida,
+# transparência achatada sobre branco e reduzidas para ~300 dpi no tamanho em que são desenhadas.
+# A versão derivada é gravada uma vez em MEDIA_ROOT/pdf_assets/ e mantida em memória por worker,
+# com chave (arquivo, mtime, tamanho): só é refeita quando o upload muda.
+ASSETS_DIR = "pdf_assets"
+MAX_PX = {
+    "logo": (480, 300),
+    "assinatura_presidente": (500, 150),
+}
+
+_lock = threading.Lock()
+_cache = {}
+
+
+class PdfImage:
+    def __init__(self, reader):
+        self.reader = reader
+        self.width, self.height = reader.getSize()
+
+    def fit(self, max_w, max_h):
+        """Tamanho (em pontos) que cabe em max_w x max_h mantendo a proporção."""
+        ratio = min(max_w / self.width, max_h / self.height)
+        return self.width * ratio, self.height * ratio
+
+
+def _chave(field):
+    st = os.stat(field.path)
+    return f"{field.name}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _derivado_path(chave):
+    nome = hashlib.sha1(chave.encode()).hexdigest() + ".png"
+    return os.path.join(settings.MEDIA_ROOT, ASSETS_DIR, nome)
+
+
+def _gerar_derivado(origem, destino, max_px):
+    from PIL import Image, ImageOps
+
+    with Image.open(origem) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode in ("RGBA", "LA", "P"):
+            im = im.convert("RGBA")
+            fundo = Image.new("RGB", im.size, (255, 255, 255))
+            fundo.paste(im, mask=im.getchannel("A"))
+            im = fundo
+        else:
+            im = im.convert("RGB")
+        im.thumbnail(max_px, Image.LANCZOS)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        tmp = f"{destino}.{os.getpid()}.tmp"
+        im.save(tmp, format="PNG", optimize=True)
+        os.replace(tmp, destino)
+
+
+def _carregar(field, kind):
+    from reportlab.lib.utils import ImageReader
+
+    chave = _chave(field)
+    destino = _derivado_path(chave)
+    if not os.path.exists(destino):
+        _gerar_derivado(field.path, destino, MAX_PX[kind])
+    reader = ImageReader(destino)
+    reader.getRGBData()  # decodifica uma vez; o ImageReader guarda os bytes
+    return chave, PdfImage(reader)
+
+
+def get_image(config, kind):
+    """PdfImage pronto para canvas.drawImage, ou None se não houver imagem válida."""
+    field = getattr(config, kind)
+    if not field:
+        return None
+    try:
+        chave = _chave(field)
+        atual = _cache.get(kind)
+        if atual and atual[0] == chave:
+            return atual[1]
+        with _lock:
+            atual = _cache.get(kind)
+            if not atual or atual[0] != chave:
+                _cache[kind] = _carregar(field, kind)
+            return _cache[kind][1]
+    except Exception:
+        return None
+
+
+def preparar(config):
+    """Gera as versões derivadas logo após o upload (chamado por AssociacaoConfigUpdateView)
+    e remove as derivadas de uploads anteriores."""
+    manter = set()
+    for kind in MAX_PX:
+        if get_image(config, kind) is not None:
+            manter.add(os.path.basename(_derivado_path(_cache[kind][0])))
+    pasta = os.path.join(settings.MEDIA_ROOT, ASSETS_DIR)
+    if os.path.isdir(pasta):
+        for nome in os.listdir(pasta):
+            if nome not in manter:
+                try:
+                    os.remove(os.path.join(pasta, nome))
+                except OSError:
+                    pass
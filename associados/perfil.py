@@ -0,0 +1,180 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+# Captura sob demanda: uma requisição de um usuário da equipe com `?perfil=1` (ou o cabeçalho
+# `X-Perfil: 1`) roda sob cProfile. O .prof e um .json (URL, tempos, log do SQL) ficam em
+# PERFIL_DIR, que guarda só as PERFIL_MAX capturas mais recentes. Uma captura por vez por processo:
+# o cProfile não aceita dois perfis ativos ao mesmo tempo.
+NOME_RE = re.compile(r"^[0-9a-z-]+$")
+SQL_MAX = 500
+SQL_TEXTO_MAX = 2000
+
+_lock = threading.Lock()
+
+
+def pedido(request):
+    if request.GET.get("perfil") != "1" and request.headers.get("X-Perfil") != "1":
+        return False
+    user = getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+class _LogSQL:
+    def __init__(self):
+        self.consultas = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += 1
+            if len(self.consultas) < SQL_MAX:
+                texto = sql if params is None or many else f"{sql} -- {params!r}"
+                self.consultas.append({"sql": texto[:SQL_TEXTO_MAX], "ms": round((time.perf_counter() - inicio) * 1000, 3)})
+
+
+def _caminho(nome, ext):
+    return os.path.join(settings.PERFIL_DIR, f"{nome}.{ext}")
+
+
+def _rotacionar():
+    """Apaga as capturas mais antigas além de PERFIL_MAX."""
+    nomes = sorted(n[:-5] for n in os.listdir(settings.PERFIL_DIR) if n.endswith(".json"))
+    for nome in nomes[:max(len(nomes) - settings.PERFIL_MAX, 0)]:
+        for ext in ("json", "prof"):
+            try:
+                os.remove(_caminho(nome, ext))
+            except OSError:
+                pass
+
+
+def capturar(request, get_response):
+    """Executa a requisição sob cProfile e grava a captura; retorna (response, nome) ou (None, None)
+    se outra captura já está em andamento neste processo."""
+    if not _lock.acquire(blocking=False):
+        return None, None
+    try:
+        perfil = cProfile.Profile()
+        log = _LogSQL()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(log):
+            perfil.enable()
+            try:
+                response = get_response(request)
+            finally:
+                perfil.disable()
+        duracao = time.perf_counter() - inicio
+
+        agora = timezone.now()
+        nome = f"{agora:%Y%m%d-%H%M%S-%f}-{os.getpid()}-{secrets.token_hex(2)}"
+        os.makedirs(settings.PERFIL_DIR, exist_ok=True)
+        perfil.dump_stats(_caminho(nome, "prof"))
+        match = getattr(request, "resolver_match", None)
+        meta = {
+            "nome": nome,
+            "data": agora.isoformat(timespec="seconds"),
+            "metodo": request.method,
+            "url": request.get_full_path(),
+            "view": match.view_name if match else None,
+            "usuario": request.user.get_username(),
+            "status": response.status_code,
+            "ms": round(duracao * 1000, 2),
+            "sql_total": log.total,
+            "sql_ms": round(sum(c["ms"] for c in log.consultas), 2),
+            "sql": log.consultas,
+        }
+        with open(_caminho(nome, "json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        _rotacionar()
+        return response, nome
+    finally:
+        _lock.release()
+
+
+def listar():
+    """Metadados das capturas, da mais recente para a mais antiga."""
+    try:
+        nomes = sorted((n[:-5] for n in os.listdir(settings.PERFIL_DIR) if n.endswith(".json")), reverse=True)
+    except FileNotFoundError:
+        return []
+    capturas = []
+    for nome in nomes:
+        meta = carregar(nome)
+        if meta:
+            capturas.append(meta)
+    return capturas
+
+
+def carregar(nome):
+    if not NOME_RE.match(nome or ""):
+        return None
+    try:
+        with open(_caminho(nome, "json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def arquivo_prof(nome):
+    """Caminho do .prof da captura, ou None."""
+    if not NOME_RE.match(nome or ""):
+        return None
+    caminho = _caminho(nome, "prof")
+    return caminho if os.path.exists(caminho) else None
+
+
+def funcoes(nome, ordem="cumulative", limite=40):
+    """As `limite` funções com maior tempo acumulado (ou próprio, ordem="tottime")."""
+    caminho = arquivo_prof(nome)
+    if not caminho:
+        return []
+    stats = pstats.Stats(caminho).stats
+    indice = 3 if ordem == "cumulative" else 2
+    linhas = []
+    for (arquivo, linha, funcao), (cc, nc, tt, ct, _) in sorted(stats.items(), key=lambda s: -s[1][indice])[:limite]:
+        linhas.append({
+            "funcao": funcao,
+            "local": f"{_relativo(arquivo)}:{linha}" if linha else arquivo,
+            "chamadas": nc if nc == cc else f"{nc}/{cc}",
+            "proprio_ms": round(tt * 1000, 2),
+            "acumulado_ms": round(ct * 1000, 2),
+        })
+    return linhas
+
+
+def _relativo(arquivo):
+    # Código do projeto relativo à raiz; bibliotecas relativas ao diretório do Python (site-packages/...)
+    for base in (str(settings.BASE_DIR), os.path.dirname(os.__file__)):
+        if arquivo.startswith(base + os.sep):
+            return arquivo[len(base) + 1:]
+    return arquivo
+
+
+class PerfilMiddleware:
+    """Roda sob cProfile as requisições marcadas por um usuário da equipe (ver `pedido`)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not pedido(request):
+            return self.get_response(request)
+        response, nome = capturar(request, self.get_response)
+        if response is None:
+            response = self.get_response(request)
+            response["X-Perfil"] = "ocupado"
+        else:
+            response["X-Perfil"] = nome
+        return response
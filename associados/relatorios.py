@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+from .models import CaixaSaldoMensal, Mensalidade
+from .utils import ANO_MAX, ANO_MIN
+
+CENTAVO = Decimal("0.01")
+
+
+def filtro_periodo(params):
+    """(ano, mes) a partir dos parâmetros GET; valores inválidos viram None."""
+    try:
+        ano = int(params.get("ano")) if params.get("ano") else None
+        mes = int(params.get("mes")) if params.get("mes") else None
+    except ValueError:
+        return None, None
+    if ano is not None and not ANO_MIN <= ano <= ANO_MAX:
+        ano = None
+    if mes is not None and not 1 <= mes <= 12:
+        mes = None
+    return ano, mes
+
+
+def periodo_q(campo, ano=None, mes=None):
+    """Filtro do período como intervalo semiaberto [início, fim) sobre a coluna (usa índice).
+
+    Só mês sem ano não forma um intervalo: nesse caso cai no lookup __month.
+    """
+    if ano and mes:
+        inicio = date(ano, mes, 1)
+        fim = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+    elif ano:
+        inicio, fim = date(ano, 1, 1), date(ano + 1, 1, 1)
+    elif mes:
+        return Q(**{f"{campo}__month": mes})
+    else:
+        return Q()
+    return Q(**{f"{campo}__gte": inicio, f"{campo}__lt": fim})
+
+
+def _somar(model, campo, periodos, metricas):
+    """Uma única consulta com Count/Sum condicionais para cada (período, métrica)."""
+    aggs = {}
+    for sufixo, q_periodo in periodos.items():
+        for nome, (func, arg, q_metrica) in metricas.items():
+            # Prefixo evita colisão do apelido com colunas de mesmo nome (ex.: CaixaSaldoMensal.receitas)
+            aggs[f"t_{nome}{sufixo}"] = func(arg, filter=q_periodo & q_metrica)
+    onde = Q()
+    for q_periodo in periodos.values():
+        if not q_periodo:
+            onde = Q()
+            break
+        onde |= q_periodo
+    res = model.objects.filter(onde).aggregate(**aggs)
+    return {k[2:]: v for k, v in res.items()}
+
+
+def totais(ano=None, mes=None, comparar=False):
+    """Totais de mensalidades e caixa do período (e do mesmo período no ano anterior, se `comparar`).
+
+    Duas consultas no total: uma em Mensalidade e outra no saldo mensal do Caixa (CaixaSaldoMensal,
+    uma linha por mês), que não depende do número de lançamentos.
+    """
+    periodos_m = {"": periodo_q("competencia", ano, mes)}
+    periodos_c = {"": periodo_q("mes", ano, mes)}
+    comparar = bool(comparar and ano)
+    if comparar:
+        periodos_m["_anterior"] = periodo_q("competencia", ano - 1, mes)
+        periodos_c["_anterior"] = periodo_q("mes", ano - 1, mes)
+
+    res = _somar(Mensalidade, "competencia", periodos_m, {
+        "pagas": (Count, "pk", Q(status="pago")),
+        "pendentes": (Count, "pk", Q(status="pendente")),
+        "recebido": (Sum, "valor", Q(status="pago")),
+    })
+    res.update(_somar(CaixaSaldoMensal, "mes", periodos_c, {
+        "receitas": (Sum, "receitas", Q()),
+        "despesas": (Sum, "despesas", Q()),
+    }))
+    for sufixo in periodos_m:
+        for nome in ("recebido", "receitas", "despesas"):
+            # No SQLite as somas voltam com resíduo de float (267447.670000000): 2 casas, como as colunas
+            res[f"{nome}{sufixo}"] = Decimal(res[f"{nome}{sufixo}"] or 0).quantize(CENTAVO)
+        res[f"saldo{sufixo}"] = res[f"receitas{sufixo}"] - res[f"despesas{sufixo}"]
+    return res
@@ -0,0 +1,165 @@
+import base64
+import json
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "associados_pescador_fts"
+PAGE_SIZE = 50
+
+_fts_disponivel = None
+
+# SQLite: tabela FTS5 de conteúdo externo, mantida por triggers sobre associados_pescador.
+# Migrações que recriam a tabela (remake do SQLite) derrubam os triggers: chame instalar_indice() de novo.
+FTS_SQLITE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "busca, content='associados_pescador', content_rowid='id', tokenize='unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON associados_pescador BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, busca) VALUES (new.id, new.busca); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON associados_pescador BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, busca) VALUES ('delete', old.id, old.busca); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF busca ON associados_pescador BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, busca) VALUES ('delete', old.id, old.busca); "
+    f"INSERT INTO {FTS_TABLE}(rowid, busca) VALUES (new.id, new.busca); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+FTS_SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+# Postgres: índice GIN trigram sobre a chave normalizada (atende LIKE '%termo%')
+TRGM_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS pescador_busca_trgm_idx ON associados_pescador USING gin (busca gin_trgm_ops)",
+]
+TRGM_POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS pescador_busca_trgm_idx",
+]
+
+
+def normalizar(texto):
+    """Remove acentos e converte para minúsculas."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", texto.lower()).split())
+
+
+def somente_digitos(texto):
+    return re.sub(r"\D", "", texto or "")
+
+
+def chave_busca(nome, cpf, rgp):
+    """Chave normalizada gravada em Pescador.busca: nome sem acentos, CPF e RGP só com dígitos.
+
+    Um RGP com letras (AM0100000000) entra também normalizado, para achar o valor digitado como
+    está no documento além dos dígitos.
+    """
+    rgp_digitos, rgp_normalizado = somente_digitos(rgp), normalizar(rgp)
+    partes = [normalizar(nome), somente_digitos(cpf), rgp_digitos]
+    if rgp_normalizado != rgp_digitos:
+        partes.append(rgp_normalizado)
+    return " ".join(p for p in partes if p)
+
+
+def termos_busca(q):
+    """Quebra a consulta em termos normalizados. CPF/RGP digitados com pontuação viram um único termo."""
+    q = (q or "").strip()
+    if not q:
+        return []
+    if re.fullmatch(r"[\d.\-/\s]+", q):
+        digitos = somente_digitos(q)
+        return [digitos] if digitos else []
+    return normalizar(q).split()
+
+
+def _executar(schema_editor, por_vendor):
+    global _fts_disponivel
+    for sql in por_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+    _fts_disponivel = None
+
+
+def instalar_indice(schema_editor):
+    """Cria (ou recria) o índice de busca do backend atual. Idempotente."""
+    _executar(schema_editor, {"sqlite": FTS_SQLITE, "postgresql": TRGM_POSTGRES})
+
+
+def remover_indice(schema_editor):
+    _executar(schema_editor, {"sqlite": FTS_SQLITE_REVERSE, "postgresql": TRGM_POSTGRES_REVERSE})
+
+
+def fts_disponivel():
+    """Indica se a tabela FTS5 (SQLite) foi criada pela migração."""
+    global _fts_disponivel
+    if connection.vendor != "sqlite":
+        return False
+    if _fts_disponivel is None:
+        with connection.cursor() as cursor:
+            _fts_disponivel = FTS_TABLE in connection.introspection.table_names(cursor)
+    return _fts_disponivel
+
+
+def filtrar(qs, termos):
+    """Aplica o filtro pelo índice do backend: FTS5 no SQLite, trigram (LIKE) no Postgres."""
+    if not termos:
+        return qs
+    if fts_disponivel():
+        match = " ".join(f'"{t}"*' for t in termos)
+        return qs.filter(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+    for t in termos:
+        qs = qs.filter(busca__contains=t)
+    return qs
+
+
+def anotar_rank(qs, termos):
+    """Rank por relevância: prefixo da chave < início de palavra < qualquer posição."""
+    if not termos:
+        return qs.annotate(rank=Value(0, output_field=IntegerField()))
+    frase = " ".join(termos)
+    return qs.annotate(
+        rank=Case(
+            When(busca__startswith=frase, then=Value(0)),
+            When(busca__contains=f" {frase}", then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def encode_cursor(obj):
+    raw = json.dumps([obj.rank, obj.nome, obj.pk], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, nome, pk = json.loads(raw)
+        return int(rank), str(nome), int(pk)
+    except Exception:
+        return None
+
+
+def buscar(qs, q=None, cursor=None, limite=PAGE_SIZE):
+    """Busca paginada por keyset sobre (rank, nome, id).
+
+    Retorna (itens, próximo_cursor); o cursor é None na última página.
+    """
+    termos = termos_busca(q)
+    qs = anotar_rank(filtrar(qs, termos), termos)
+    pos = decode_cursor(cursor) if cursor else None
+    if pos:
+        rank, nome, pk = pos
+        qs = qs.filter(
+            Q(rank__gt=rank)
+            | Q(rank=rank, nome__gt=nome)
+            | Q(rank=rank, nome=nome, pk__gt=pk)
+        )
+    itens = list(qs.order_by("rank", "nome", "pk")[: limite + 1])
+    proximo = encode_cursor(itens[limite - 1]) if len(itens) > limite else None
+    return itens[:limite], proximo
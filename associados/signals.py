@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .armazenamento import liberar
+from .cache import invalidar_config
+from .models import AssociacaoConfig, Documento
+
+
+@receiver(post_save, sender=AssociacaoConfig)
+@receiver(post_delete, sender=AssociacaoConfig)
+def associacao_config_alterada(sender, instance, **kwargs):
+    # Invalida só depois do commit, para nenhum worker reler o estado antigo
+    transaction.on_commit(invalidar_config)
+
+
+@receiver(post_delete, sender=Documento)
+def documento_removido(sender, instance, **kwargs):
+    # Também cobre exclusões em cascata (pescador removido) e em massa
+    if instance.blob_id:
+        liberar(instance.blob_id)
@@ -0,0 +1,216 @@
+import io
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count
+from stdnum.br import cpf as br_cpf
+
+from .armazenamento import armazenar
+from .models import (
+    Arquivo,
+    CaixaLancamento,
+    CaixaSaldoMensal,
+    Documento,
+    Endereco,
+    Mensalidade,
+    Pescador,
+    ResumoAnual,
+    Sequencia,
+)
+from .search import chave_busca
+
+# Dados sintéticos para medir o sistema em escala (ex.: 10 mil pescadores x 10 anos de
+# mensalidades x 100 mil lançamentos no Caixa). Mesma semente, escala e mês final -> mesmos dados.
+# Tudo é gravado com bulk_create; resumos anuais e saldos do Caixa são reconstruídos no fim.
+LOTE = 5000
+PESCADORES_POR_LOTE = 500  # cada um traz até 12 x anos mensalidades em memória
+
+NOMES = (
+    "Ana", "Antônio", "Benedito", "Carlos", "Cleide", "Domingos", "Edilene", "Francisca", "Francisco",
+    "Geraldo", "Iracema", "Joana", "João", "José", "Josefa", "Luzia", "Manoel", "Maria", "Raimunda",
+    "Raimundo", "Rosa", "Sebastião", "Socorro", "Valdir",
+)
+SOBRENOMES = (
+    "Almeida", "Alves", "Araújo", "Barbosa", "Cardoso", "Costa", "Ferreira", "Gomes", "Lima", "Marques",
+    "Monteiro", "Nascimento", "Oliveira", "Pereira", "Ribeiro", "Rodrigues", "Santos", "Silva", "Sousa", "Vieira",
+)
+BAIRROS = ("Centro", "São Francisco", "Nova Esperança", "Beira Rio", "Santa Luzia", "Bairro da Praia")
+LOGRADOUROS = ("Rua", "Travessa", "Avenida", "Beco")
+RECEITAS = (("Mensalidade", 0.6), ("Doação", 0.15), ("Evento", 0.15), ("Convênio", 0.1))
+DESPESAS = (("Material", 0.3), ("Energia", 0.2), ("Aluguel", 0.15), ("Salário", 0.2), ("Transporte", 0.15))
+# Por pescador, na ordem: os primeiros `documentos` tipos
+TIPOS_DOCUMENTO = ("RG", "CPF", "RGP", "COMPROVANTE_ENDERECO", "FOTO", "OUTRO")
+
+
+class Escala:
+    def __init__(self, pescadores=1000, anos=3, caixa=10000, documentos=2, ate=None, semente=1):
+        self.pescadores = pescadores
+        self.anos = anos
+        self.caixa = caixa
+        self.documentos = min(documentos, len(TIPOS_DOCUMENTO))
+        ate = ate or date.today()
+        self.ate = ate.replace(day=1)
+        self.inicio = date(self.ate.year - anos + 1, 1, 1)
+        self.semente = semente
+
+
+def _meses(inicio, fim):
+    ano, mes = inicio.year, inicio.month
+    while (ano, mes) <= (fim.year, fim.month):
+        yield date(ano, mes, 1)
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+def _digitos_cpf(base):
+    """Os dois dígitos verificadores do CPF (módulo 11) para os 9 dígitos de `base`."""
+    digitos = [int(d) for d in base]
+    for _ in range(2):
+        soma = sum(d * peso for d, peso in zip(digitos, range(len(digitos) + 1, 1, -1)))
+        digitos.append(soma * 10 % 11 % 10)
+    return "".join(map(str, digitos[-2:]))
+
+
+def _cpf(rnd, usados):
+    while True:
+        base = "".join(rnd.choice("0123456789") for _ in range(9))
+        numero = base + _digitos_cpf(base)
+        if numero not in usados and len(set(numero)) > 1:
+            usados.add(numero)
+            return br_cpf.format(numero)
+
+
+def _pescador(rnd, i, escala, cpfs):
+    nome = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+    cpf = _cpf(rnd, cpfs)
+    rgp = f"AM{escala.semente % 100:02d}{i:08d}"
+    nascimento = date(rnd.randint(1950, 2004), rnd.randint(1, 12), rnd.randint(1, 28))
+    associacao = escala.inicio + timedelta(days=rnd.randint(-3650, (escala.ate - escala.inicio).days))
+    return Pescador(
+        nome=nome,
+        cpf=cpf,
+        rgp=rgp,
+        rg=str(rnd.randint(1000000, 9999999)),
+        rg_orgao_emissor="SSP/AM",
+        telefone=f"(97) 9{rnd.randint(8000, 9999)}-{rnd.randint(0, 9999):04d}",
+        data_nascimento=nascimento,
+        data_associacao=associacao,
+        busca=chave_busca(nome, cpf, rgp),
+    )
+
+
+def _endereco(rnd, pescador):
+    return Endereco(
+        pescador=pescador,
+        logradouro=f"{rnd.choice(LOGRADOUROS)} {rnd.choice(SOBRENOMES)}",
+        numero=str(rnd.randint(1, 2000)),
+        bairro=rnd.choice(BAIRROS),
+        cidade="Ipixuna",
+        estado="AM",
+        cep="69890-000",
+    )
+
+
+def _mensalidades(rnd, pescador, escala, valor, hoje):
+    """Mensalidades do pescador desde a associação (ou início da escala) até o mês final."""
+    inicio = max(escala.inicio, pescador.data_associacao.replace(day=1))
+    for competencia in _meses(inicio, escala.ate):
+        sorteio = rnd.random()
+        m = Mensalidade(pescador=pescador, competencia=competencia, valor=valor)
+        if sorteio < 0.03:
+            m.status = "isento"
+        elif sorteio < 0.88:
+            m.status = "pago"
+            m.data_pagamento = min(competencia + timedelta(days=rnd.randint(0, 45)), hoje)
+            m.forma_pagamento = rnd.choice(("Dinheiro", "PIX", "PIX", "Transferência"))
+            m.recibo_token = "%016x" % rnd.getrandbits(64)
+        yield m
+
+
+def _documento_blobs(tipos):
+    """Um arquivo (JPEG pequeno) por tipo de documento, compartilhado por todos os pescadores."""
+    from PIL import Image, ImageDraw
+
+    blobs = {}
+    for i, tipo in enumerate(tipos):
+        im = Image.new("RGB", (600, 400), (240 - 20 * i, 240, 220 + 5 * i))
+        ImageDraw.Draw(im).text((20, 20), f"Documento sintético: {tipo}", fill=(0, 0, 0))
+        buf = io.BytesIO()
+        im.save(buf, format="JPEG", quality=80)
+        buf.seek(0)
+        blobs[tipo] = armazenar(buf, f"sintetico_{tipo.lower()}.jpg")
+    return blobs
+
+
+def _caixa(rnd, escala):
+    dias = (escala.ate.replace(day=28) - escala.inicio).days
+    for _ in range(escala.caixa):
+        receita = rnd.random() < 0.55
+        categorias = RECEITAS if receita else DESPESAS
+        categoria = rnd.choices([c for c, _ in categorias], [p for _, p in categorias])[0]
+        valor = Decimal(rnd.randint(500, 50000 if receita else 80000)) / 100
+        yield CaixaLancamento(
+            tipo="receita" if receita else "despesa",
+            categoria=categoria,
+            descricao=f"{categoria} (sintético)",
+            valor=valor,
+            data=escala.inicio + timedelta(days=rnd.randint(0, dias)),
+        )
+
+
+def _gravar(modelo, objetos):
+    total = 0
+    lote = []
+    for obj in objetos:
+        lote.append(obj)
+        if len(lote) >= LOTE:
+            modelo.objects.bulk_create(lote)
+            total += len(lote)
+            lote = []
+    modelo.objects.bulk_create(lote)
+    return total + len(lote)
+
+
+def gerar(escala, valor=Decimal("25.00"), progresso=None):
+    """Gera os dados de `escala` e retorna as quantidades gravadas por modelo."""
+    rnd = random.Random(escala.semente)
+    hoje = date.today()
+    totais = {"pescadores": 0, "mensalidades": 0, "documentos": 0, "caixa": 0}
+    tipos = TIPOS_DOCUMENTO[:escala.documentos]
+    blobs = _documento_blobs(tipos)
+    cpfs = set()
+
+    for inicio in range(0, escala.pescadores, PESCADORES_POR_LOTE):
+        fim = min(inicio + PESCADORES_POR_LOTE, escala.pescadores)
+        with transaction.atomic():
+            pescadores = [_pescador(rnd, i, escala, cpfs) for i in range(inicio, fim)]
+            Pescador.objects.bulk_create(pescadores)
+            if pescadores[0].pk is None:
+                # Backends sem RETURNING no bulk_create: relê os ids pelo RGP (único)
+                ids = dict(Pescador.objects.filter(rgp__in=[p.rgp for p in pescadores]).values_list("rgp", "pk"))
+                for p in pescadores:
+                    p.pk = ids[p.rgp]
+            Endereco.objects.bulk_create([_endereco(rnd, p) for p in pescadores], batch_size=1000)
+            mensalidades = [m for p in pescadores for m in _mensalidades(rnd, p, escala, valor, hoje)]
+            pagas = [m for m in mensalidades if m.status == "pago"]
+            for m, numero in zip(pagas, Sequencia.reservar("recibo", len(pagas)) if pagas else ()):
+                m.recibo_numero = numero
+            totais["mensalidades"] += _gravar(Mensalidade, mensalidades)
+            totais["documentos"] += _gravar(Documento, (
+                Documento(pescador=p, tipo=tipo, arquivo=blobs[tipo].arquivo.name, blob=blobs[tipo])
+                for p in pescadores
+                for tipo in tipos
+            ))
+        totais["pescadores"] += len(pescadores)
+        if progresso:
+            progresso(totais)
+
+    with transaction.atomic():
+        totais["caixa"] = _gravar(CaixaLancamento, _caixa(rnd, escala))
+        for blob in Arquivo.objects.filter(pk__in=[b.pk for b in blobs.values()]).annotate(n=Count("documentos")):
+            # bulk_create não passa por Documento.save(): referências = documentos que apontam para o blob
+            Arquivo.objects.filter(pk=blob.pk).update(referencias=blob.n)
+        ResumoAnual.reconstruir()
+        CaixaSaldoMensal.reconstruir()
+    return totais
@@ -1,3 +1,515 @@
-from django.test import TestCase
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import caixa, imagens, jobs, relatorios, search
+from .mensalidades import gerar_competencias
+from .models import (
+    Arquivo, CaixaLancamento, CaixaResumoMensal, CaixaSaldoMensal, Documento, Mensalidade, PdfJob, Pescador,
+    ResumoAnual, Sequencia,
+)
+from .utils import parse_competencia
+
+
+def criar_pescador(i, **kwargs):
+    dados = {
+        "nome": f"Pescador {i:03d}",
+        "cpf": f"{i:011d}",
+        "rgp": f"{i:010d}",
+        "data_nascimento": date(1980, 1, 1),
+        "data_associacao": date(2020, 1, 1),
+    }
+    dados.update(kwargs)
+    return Pescador.objects.create(**dados)
+
+
+def cpf_valido(i):
+    base = [int(d) for d in f"{i + 100000000:09d}"]
+    for _ in range(2):
+        soma = sum(d * peso for d, peso in zip(base, range(len(base) + 1, 1, -1)))
+        base.append(soma * 10 % 11 % 10)
+    return "".join(map(str, base))
+
+
+class MidiaTemporaria:
+    """MEDIA_ROOT em pasta temporária, apagada ao fim de cada teste."""
+
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media))
+
+    def criar_documento(self, pescador, conteudo=b"%PDF-1.4 documento", nome="rg.pdf", tipo="RG"):
+        documento = Documento(pescador=pescador, tipo=tipo, arquivo=SimpleUploadedFile(nome, conteudo))
+        documento.save()
+        return documento
+
+    def existe(self, nome):
+        return os.path.exists(os.path.join(self.media, nome))
+
+
+class BuscaTests(TestCase):
+    def test_rgp_com_letras(self):
+        p = criar_pescador(1, nome="José da Silva", rgp="AM0100000000")
+        criar_pescador(2)
+        for q in ("AM0100000000", "am01", "0100000000", "AM-0100000000", "jose silva"):
+            with self.subTest(q=q):
+                itens, _ = search.buscar(Pescador.objects.all(), q)
+                self.assertEqual([i.pk for i in itens], [p.pk])
+
+    def test_cpf_com_pontuacao(self):
+        p = criar_pescador(1, cpf="529.982.247-25")
+        itens, _ = search.buscar(Pescador.objects.all(), "529.982.247-25")
+        self.assertEqual([i.pk for i in itens], [p.pk])
+
+    def test_cursor_percorre_todos_sem_repetir(self):
+        # Nomes repetidos: o desempate pelo id mantém a ordem estável entre páginas
+        for i in range(23):
+            criar_pescador(i, nome=f"Maria {i % 4}")
+        vistos, cursor = [], None
+        while True:
+            itens, cursor = search.buscar(Pescador.objects.all(), "maria", cursor=cursor, limite=5)
+            vistos += [(p.nome, p.pk) for p in itens]
+            if cursor is None:
+                break
+        self.assertEqual(vistos, sorted(Pescador.objects.values_list("nome", "pk")))
+
+    def test_cursor_invalido_volta_ao_inicio(self):
+        criar_pescador(1)
+        itens, cursor = search.buscar(Pescador.objects.all(), None, cursor="lixo")
+        self.assertEqual(len(itens), 1)
+        self.assertIsNone(cursor)
+
+
+class PeriodoTests(TestCase):
+    def test_ano_fora_do_intervalo_e_ignorado(self):
+        self.assertEqual(relatorios.filtro_periodo({"ano": "9999"}), (None, None))
+        self.assertEqual(relatorios.filtro_periodo({"ano": "1", "mes": "3"}), (None, 3))
+        self.assertEqual(relatorios.filtro_periodo({"ano": "2024", "mes": "13"}), (2024, None))
+
+    def test_paginas_aceitam_ano_invalido(self):
+        self.client.force_login(User.objects.create_user("equipe", is_staff=True))
+        for nome in ("relatorios", "caixa", "defeso_aptos", "exportar_mensalidades"):
+            for query in ("ano=9999", "ano=1&comparar=1", "ano=abc"):
+                with self.subTest(view=nome, query=query):
+                    resposta = self.client.get(f"{reverse('associados:' + nome)}?{query}")
+                    self.assertEqual(resposta.status_code, 200)
+
+    def test_totais_com_duas_casas(self):
+        p = criar_pescador(1)
+        Mensalidade.objects.create(pescador=p, competencia=date(2024, 1, 1), valor=Decimal("0.10"), status="pago")
+        Mensalidade.objects.create(pescador=p, competencia=date(2024, 2, 1), valor=Decimal("0.20"), status="pago")
+        CaixaLancamento.objects.create(data=date(2024, 1, 5), tipo="despesa", categoria="a", valor=Decimal("100000.10"))
+        CaixaLancamento.objects.create(data=date(2024, 1, 6), tipo="despesa", categoria="a", valor=Decimal("38.03"))
+        t = relatorios.totais(2024, comparar=True)
+        for nome in ("recebido", "despesas", "saldo", "recebido_anterior", "saldo_anterior"):
+            with self.subTest(nome=nome):
+                self.assertEqual(t[nome].as_tuple().exponent, -2)
+        self.assertEqual(str(t["recebido"]), "0.30")
+        self.assertEqual(str(t["saldo"]), "-100038.13")
+
+
+class CaixaSaldoMensalTests(TestCase):
+    def estado(self):
+        return (
+            list(CaixaSaldoMensal.objects.order_by("mes").values_list("mes", "receitas", "despesas", "saldo_final")),
+            sorted(CaixaResumoMensal.objects.values_list("mes", "tipo", "categoria", "total", "quantidade")),
+        )
+
+    def test_atualizacao_incremental_igual_a_reconstrucao(self):
+        rnd = random.Random(2)
+        for _ in range(80):
+            lancamentos = list(CaixaLancamento.objects.all())
+            sorteio = rnd.random()
+            if sorteio < 0.6 or not lancamentos:
+                CaixaLancamento.objects.create(
+                    data=date(2024, rnd.randint(1, 12), rnd.randint(1, 28)),
+                    tipo=rnd.choice(["receita", "despesa"]),
+                    categoria=rnd.choice(["Mensalidade", "Material"]),
+                    valor=Decimal(rnd.randint(1, 99999)) / 100,
+                )
+            elif sorteio < 0.8:
+                lanc = rnd.choice(lancamentos)
+                lanc.data = date(2024, rnd.randint(1, 12), 1)
+                lanc.valor = Decimal(rnd.randint(1, 99999)) / 100
+                lanc.save()
+            else:
+                rnd.choice(lancamentos).delete()
+        # Esvazia um mês com movimento
+        mes = rnd.choice(list(CaixaLancamento.objects.dates("data", "month")))
+        for lanc in CaixaLancamento.objects.filter(data__year=mes.year, data__month=mes.month):
+            lanc.delete()
+        incremental = self.estado()
+        CaixaSaldoMensal.reconstruir()
+        self.assertEqual(incremental, self.estado())
+
+    def test_mes_esvaziado_perde_a_linha_de_saldo(self):
+        CaixaLancamento.objects.create(data=date(2024, 2, 10), tipo="receita", categoria="a", valor=Decimal("50.00"))
+        marco = CaixaLancamento.objects.create(
+            data=date(2024, 3, 10), tipo="despesa", categoria="a", valor=Decimal("20.00")
+        )
+        CaixaLancamento.objects.create(data=date(2024, 4, 10), tipo="receita", categoria="b", valor=Decimal("5.00"))
+        marco.delete()
+        incremental = self.estado()
+        self.assertNotIn(date(2024, 3, 1), [linha[0] for linha in incremental[0]])
+        self.assertEqual(CaixaSaldoMensal.saldo_em(date(2024, 4, 1)), Decimal("55.00"))
+        CaixaSaldoMensal.reconstruir()
+        self.assertEqual(incremental, self.estado())
+
+    def test_mes_sem_movimento_nao_cria_saldo(self):
+        CaixaSaldoMensal.recalcular({date(2024, 5, 1)})
+        self.assertFalse(CaixaSaldoMensal.objects.exists())
+
+
+class ResumoAnualTests(TestCase):
+    def test_atualizacao_incremental_igual_a_reconstrucao(self):
+        rnd = random.Random(1)
+        for i in range(4):
+            criar_pescador(i)
+        gerar_competencias(date(2023, 11, 1), date(2024, 3, 1), valor=Decimal("25.00"))
+        mensalidades = list(Mensalidade.objects.all())
+        for _ in range(60):
+            m = rnd.choice(mensalidades)
+            m.status = rnd.choice(["pago", "pendente", "isento"])
+            m.valor = Decimal(rnd.randint(1, 5000)) / 100
+            m.save()
+        # Troca de ano: os resumos do ano antigo e do novo são recalculados
+        m = mensalidades[0]
+        m.competencia = date(2022, 6, 1)
+        m.save()
+        for m in rnd.sample(mensalidades[1:], 5):
+            m.delete()
+
+        def estado():
+            return sorted(
+                ResumoAnual.objects.exclude(pagas=0, pendentes=0, isentas=0)
+                .values_list("pescador_id", "ano", "pagas", "pendentes", "isentas", "valor_pago")
+            )
+
+        incremental = estado()
+        ResumoAnual.reconstruir()
+        self.assertEqual(incremental, estado())
+
+
+class ExtratoTests(TestCase):
+    def test_cursor_percorre_todos_com_saldo_acumulado(self):
+        rnd = random.Random(3)
+        for _ in range(37):
+            CaixaLancamento.objects.create(
+                data=date(2024, rnd.randint(1, 4), rnd.randint(1, 28)),
+                tipo=rnd.choice(["receita", "despesa"]),
+                categoria="Teste",
+                valor=Decimal(rnd.randint(1, 99999)) / 100,
+            )
+        vistos, cursor = [], None
+        while True:
+            itens, cursor = caixa.extrato(CaixaLancamento.objects.all(), cursor=cursor, limite=10)
+            vistos += itens
+            if cursor is None:
+                break
+
+        esperado = list(CaixaLancamento.objects.order_by(*caixa.ORDEM))
+        self.assertEqual([l.pk for l in vistos], [l.pk for l in esperado])
+        saldo = Decimal(0)
+        for lanc in reversed(esperado):
+            saldo += lanc.valor if lanc.tipo == "receita" else -lanc.valor
+            lanc.saldo_esperado = saldo
+        for visto, lanc in zip(vistos, esperado):
+            self.assertEqual(round(Decimal(visto.saldo_linha), 2), lanc.saldo_esperado)
+
+
+class GerarCompetenciasTests(TestCase):
+    def test_conta_so_as_criadas(self):
+        pescadores = [criar_pescador(i) for i in range(3)]
+        Mensalidade.objects.create(pescador=pescadores[0], competencia=date(2024, 2, 1), valor=10)
+        res = gerar_competencias(date(2024, 1, 1), date(2024, 3, 1))
+        self.assertEqual(res, {"pescadores": 3, "criadas": 8, "existentes": 1})
+        self.assertEqual(Mensalidade.objects.count(), 9)
+        self.assertEqual(gerar_competencias(date(2024, 1, 1), date(2024, 3, 1))["criadas"], 0)
+
+    def test_lote_pela_web_limitado(self):
+        criar_pescador(1)
+        self.client.force_login(User.objects.create_user("equipe", is_staff=True))
+        url = reverse("associados:mensalidades_gerar_lote")
+        self.client.post(url, {"de": "2024-01", "ate": "2027-01"})
+        self.assertFalse(Mensalidade.objects.exists())
+        self.client.post(url, {"de": "2024-01", "ate": "2026-12"})
+        self.assertEqual(Mensalidade.objects.count(), 36)
+
+    def test_ano_fora_do_intervalo_nao_quebra(self):
+        criar_pescador(1)
+        self.client.force_login(User.objects.create_user("equipe", is_staff=True))
+        resposta = self.client.post(
+            reverse("associados:mensalidades_gerar_lote"), {"de": "11/9999", "ate": "12/9999"}, follow=True
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertContains(resposta, "Intervalo de competências inválido.")
+        with self.assertRaises(CommandError):
+            call_command("gerar_competencias", de="9999-12", stdout=StringIO())
+        self.assertFalse(Mensalidade.objects.exists())
+
+
+class SequenciaTests(TestCase):
+    def test_reserva_numeros_consecutivos(self):
+        self.assertEqual(list(Sequencia.reservar("teste", 3)), [1, 2, 3])
+        self.assertEqual(Sequencia.proximo("teste"), 4)
+        self.assertEqual(list(Sequencia.reservar("teste", 2)), [5, 6])
+
+    def test_sequencias_independentes(self):
+        Sequencia.reservar("a", 5)
+        self.assertEqual(Sequencia.proximo("b"), 1)
+        self.assertEqual(Sequencia.proximo("a"), 6)
+
+    def test_rollback_devolve_os_numeros(self):
+        Sequencia.reservar("teste", 2)
+        try:
+            with transaction.atomic():
+                self.assertEqual(list(Sequencia.reservar("teste", 10)), list(range(3, 13)))
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(Sequencia.proximo("teste"), 3)
+
+
+class RecibosLoteTests(TestCase):
+    def test_exige_equipe(self):
+        url = reverse("associados:recibos_lote_pdf") + "?de=2024-01"
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user("associado"))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_competencia_fora_dos_anos_aceitos(self):
+        self.client.force_login(User.objects.create_user("equipe", is_staff=True))
+        url = reverse("associados:recibos_lote_pdf")
+        self.assertEqual(self.client.get(url + "?de=12/9999").status_code, 404)
+        self.assertEqual(parse_competencia("12/9999"), None)
+        self.assertEqual(parse_competencia("2100-12"), date(2100, 12, 1))
+
+
+class VerificacaoReciboTests(TestCase):
+    def setUp(self):
+        self.mensalidade = Mensalidade.objects.create(
+            pescador=criar_pescador(1), competencia=date(2024, 1, 1), valor=25, status="pago",
+            data_pagamento=date(2024, 1, 10), recibo_numero=7, recibo_token="abc123",
+        )
+
+    def test_token_valido(self):
+        resposta = self.client.get(reverse("associados:recibo_verificar", args=[7, "abc123"]))
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_token_invalido_ou_fora_do_ascii(self):
+        for token in ("abc124", "é"):
+            with self.subTest(token=token):
+                url = reverse("associados:recibo_verificar", args=[7, token])
+                self.assertEqual(self.client.get(url).status_code, 404)
+                url = reverse("associados:recibo_pdf", args=[self.mensalidade.pk])
+                self.assertEqual(self.client.get(url, {"t": token}).status_code, 404)
+
+
+
+class ImportarTests(TestCase):
+    def enviar(self, conteudo, codificacao="utf-8-sig"):
+        self.client.force_login(User.objects.get_or_create(username="equipe", is_staff=True)[0])
+        arquivo = SimpleUploadedFile("pescadores.csv", conteudo, content_type="text/csv")
+        return self.client.post(reverse("associados:pescadores_importar"), {"arquivo": arquivo, "codificacao": codificacao})
+
+    def test_erro_de_codificacao_nao_grava_nada(self):
+        # Byte inválido depois do primeiro lote (CHUNK_SIZE linhas): nada pode ter sido gravado
+        linhas = ["Nome;CPF;RGP;Nascimento"]
+        linhas += [f"Pescador {i};{cpf_valido(i)};{i:08d};01/01/1980" for i in range(1100)]
+        conteudo = "\n".join(linhas).encode() + "\nJoão;{};99999999;01/01/1980\n".format(cpf_valido(5000)).encode("cp1252")
+        resposta = self.enviar(conteudo)
+        self.assertContains(resposta, "Tente a outra codificação")
+        self.assertFalse(Pescador.objects.exists())
+
+        resposta = self.enviar(conteudo, "cp1252")
+        self.assertEqual(Pescador.objects.count(), 1101)
+
+
+@override_settings(PDF_ASYNC=True)
+class PdfJobTests(TestCase):
+    def setUp(self):
+        self.pescador = criar_pescador(1)
+
+    def test_job_abandonado_na_ultima_tentativa_vira_erro(self):
+        _, job = jobs.obter("dossie", self.pescador, "http://testserver")
+        PdfJob.objects.filter(pk=job.pk).update(
+            status="processando", tentativas=jobs.MAX_TENTATIVAS,
+            iniciado_em=timezone.now() - jobs.PROCESSANDO_TIMEOUT - timedelta(minutes=1),
+        )
+        self.assertIsNone(jobs.proximo_job())
+        self.assertEqual(PdfJob.objects.get(pk=job.pk).status, "erro")
+
+        # Pedido de novo depois de ERRO_NOVA_TENTATIVA: volta para a fila
+        PdfJob.objects.filter(pk=job.pk).update(concluido_em=timezone.now() - jobs.ERRO_NOVA_TENTATIVA * 2)
+        _, job = jobs.obter("dossie", self.pescador, "http://testserver")
+        self.assertEqual((job.status, job.tentativas), ("pendente", 0))
+
+    def test_obter_sem_worker_marca_abandonado(self):
+        _, job = jobs.obter("dossie", self.pescador, "http://testserver")
+        PdfJob.objects.filter(pk=job.pk).update(
+            status="processando", tentativas=jobs.MAX_TENTATIVAS,
+            iniciado_em=timezone.now() - jobs.PROCESSANDO_TIMEOUT - timedelta(minutes=1),
+        )
+        _, job = jobs.obter("dossie", self.pescador, "http://testserver")
+        self.assertEqual(job.status, "erro")
+
+
+class MidiaProtegidaTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.documento = self.criar_documento(criar_pescador(1))
+        self.url = reverse("associados:midia_protegida", args=[self.documento.arquivo.name])
+        self.equipe = User.objects.create_user("equipe", password="x", is_staff=True)
+
+    def test_exige_equipe(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        User.objects.create_user("comum", password="x")
+        self.client.login(username="comum", password="x")
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_caminho_fora_de_media_root(self):
+        self.client.force_login(self.equipe)
+        self.assertEqual(self.client.get("/media/documentos/../../spi/settings.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/blobs/../../../etc/passwd").status_code, 404)
+
+    def test_arquivo_sem_documento(self):
+        os.makedirs(os.path.join(self.media, "documentos"))
+        with open(os.path.join(self.media, "documentos", "solto.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4 solto")
+        self.client.force_login(self.equipe)
+        self.assertEqual(self.client.get("/media/documentos/solto.pdf").status_code, 404)
+        self.assertEqual(self.client.get("/media/blobs/00/00/" + "0" * 64 + ".pdf").status_code, 404)
+
+    @override_settings(MEDIA_X_ACCEL=True, MEDIA_X_ACCEL_PREFIX="/protected/")
+    def test_x_accel_redirect(self):
+        self.client.force_login(self.equipe)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected/" + self.documento.arquivo.name)
+        self.assertEqual(response.content, b"")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    @override_settings(MEDIA_X_ACCEL=False)
+    def test_file_response_sem_nginx(self):
+        self.client.force_login(self.equipe)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Accel-Redirect", response)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 documento")
+
+
+class ArmazenamentoTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        from PIL import Image
+
+        buf = BytesIO()
+        Image.new("RGB", (40, 30), "navy").save(buf, "PNG")
+        self.foto = buf.getvalue()
+        self.pescador = criar_pescador(1)
+
+    def test_mesmo_conteudo_um_blob(self):
+        a = self.criar_documento(self.pescador, self.foto, "foto.png", "FOTO")
+        b = self.criar_documento(criar_pescador(2), self.foto, "outra.png", "FOTO")
+        self.assertEqual(a.blob_id, b.blob_id)
+        self.assertEqual(a.arquivo.name, b.arquivo.name)
+        self.assertEqual(Arquivo.objects.get().referencias, 2)
+
+    def test_arquivo_apagado_com_a_ultima_referencia(self):
+        a = self.criar_documento(self.pescador, self.foto, "foto.png", "FOTO")
+        b = self.criar_documento(self.pescador, self.foto, "foto.png", "FOTO")
+        nomes = [a.arquivo.name] + [imagens.nome_derivado(a.arquivo.name, tipo) for tipo in imagens.DERIVADOS]
+        self.assertTrue(all(map(self.existe, nomes)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            a.delete()
+        self.assertEqual(Arquivo.objects.get().referencias, 1)
+        self.assertTrue(all(map(self.existe, nomes)))
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            b.delete()
+            # Só depois do commit: um rollback não pode deixar o registro sem arquivo
+            self.assertTrue(all(map(self.existe, nomes)))
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Arquivo.objects.exists())
+        self.assertFalse(any(map(self.existe, nomes)))
+
+    def test_exclusao_em_cascata_libera_os_blobs(self):
+        foto = self.criar_documento(self.pescador, self.foto, "foto.png", "FOTO")
+        rg = self.criar_documento(self.pescador)
+        compartilhado = self.criar_documento(criar_pescador(2))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pescador.delete()
+        self.assertFalse(self.existe(foto.arquivo.name))
+        self.assertEqual(list(Arquivo.objects.values_list("pk", "referencias")), [(compartilhado.blob_id, 1)])
+        self.assertTrue(self.existe(rg.arquivo.name))
+
+
+class GetCondicionalTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.pescador = criar_pescador(1)
+        self.documento = self.criar_documento(self.pescador)
+        self.mensalidade = Mensalidade.objects.create(
+            pescador=self.pescador, competencia=date.today().replace(day=1), valor=Decimal("25.00"),
+            status="pago", data_pagamento=date.today(), recibo_numero=1, recibo_token="abc123",
+        )
+        self.client.force_login(User.objects.create_user("equipe", password="x", is_staff=True))
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        return response["ETag"]
+
+    def test_recibo(self):
+        url = reverse("associados:recibo_pdf", args=[self.mensalidade.pk])
+        etag = self.etag(url)
+        self.mensalidade.observacao = "Pago em dinheiro"
+        self.mensalidade.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_dossie(self):
+        url = reverse("associados:defeso_dossie_pdf", args=[self.pescador.pk])
+        etag = self.etag(url)
+        self.documento.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_pagina_do_pescador(self):
+        url = reverse("associados:pescador_detail", args=[self.pescador.pk])
+        etag = self.etag(url)
+        self.mensalidade.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_sem_304_com_mensagens_pendentes(self):
+        url = reverse("associados:pescador_detail", args=[self.pescador.pk])
+        etag = self.etag(url)
+        # Competência já existente: nada muda, só fica a mensagem para a próxima página
+        self.client.post(
+            reverse("associados:mensalidade_adicionar", args=[self.pescador.pk]),
+            {"competencia": self.mensalidade.competencia.strftime("%Y-%m")},
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Mensalidade já existia")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
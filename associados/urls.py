@@ -1,4 +1,5 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 from . import views
 
 app_name = "associados"
@@ -6,8 +7,11 @@ app_name = "associados"
 urlpatterns = [
     path("", views.PescadorListView.as_view(), name="pescador_list"),
     path("pescador/novo/", views.PescadorCreateView.as_view(), name="pescador_create"),
+    path("pescadores/importar/", views.pescadores_importar, name="pescadores_importar"),
     path("pescador/<int:pk>/editar/", views.PescadorUpdateView.as_view(), name="pescador_update"),
     path("pescador/<int:pk>/", views.PescadorDetailView.as_view(), name="pescador_detail"),
+    path("pescador/<int:pk>/documentos/", views.pescador_documentos, name="pescador_documentos"),
+    path("pescador/<int:pk>/mensalidades/", views.pescador_mensalidades, name="pescador_mensalidades"),
     path("pescador/<int:pk>/ficha/", views.PescadorFichaView.as_view(), name="pescador_ficha"),
     path("pescador/<int:pk>/dossie-defeso/", views.defeso_dossie_pdf, name="defeso_dossie_pdf"),
 
@@ -16,11 +20,27 @@ urlpatterns = [
     path("pescador/<int:pk>/mensalidade/gerar-ano/", views.mensalidades_gerar_ano, name="mensalidades_gerar_ano"),
     path("mensalidade/<int:pk>/pagar/", views.mensalidade_pagar, name="mensalidade_pagar"),
     path("mensalidade/<int:pk>/recibo/", views.recibo_pdf, name="recibo_pdf"),
+    path("v/<int:numero>/<str:token>/", views.recibo_verificar, name="recibo_verificar"),
     path("mensalidade/<int:pk>/excluir/", views.mensalidade_excluir, name="mensalidade_excluir"),
+    path("recibos/lote/", views.recibos_lote_pdf, name="recibos_lote_pdf"),
+    path("mensalidades/gerar-lote/", views.mensalidades_gerar_lote, name="mensalidades_gerar_lote"),
 
     path("associacao/", views.AssociacaoConfigUpdateView.as_view(), name="associacao_config"),
     path("relatorios/", views.RelatoriosView.as_view(), name="relatorios"),
+    path("relatorios/defeso-aptos/", views.DefesoAptosView.as_view(), name="defeso_aptos"),
     path("caixa/", views.CaixaView.as_view(), name="caixa"),
     path("caixa/<int:pk>/editar/", views.CaixaEditView.as_view(), name="caixa_editar"),
     path("caixa/<int:pk>/excluir/", views.caixa_excluir, name="caixa_excluir"),
+
+    # Antes do static() de desenvolvimento: documentos nunca são servidos diretamente
+    re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<caminho>(?:blobs|documentos)/.+)$", views.midia_protegida, name="midia_protegida"),
+
+    path("exportar/pescadores.csv", views.exportar_pescadores, name="exportar_pescadores"),
+    path("exportar/mensalidades.csv", views.exportar_mensalidades, name="exportar_mensalidades"),
+    path("exportar/caixa.csv", views.exportar_caixa, name="exportar_caixa"),
+
+    path("metrics", views.metricas_prometheus, name="metricas"),
+    path("perfis/", views.perfis, name="perfis"),
+    path("perfis/<slug:nome>/", views.perfil_detalhe, name="perfil_detalhe"),
+    path("perfis/<slug:nome>.prof", views.perfil_download, name="perfil_download"),
 ]
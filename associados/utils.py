@@ -0,0 +1,41 @@
+from datetime import date
+
+# Anos aceitos em filtros e competências. Fora desse intervalo a entrada é ignorada: date() não
+# aceita o ano 10000 (do mês seguinte a 12/9999) nem o 0 (do ano anterior de `comparar`)
+ANO_MIN, ANO_MAX = 1900, 2100
+
+
+def parse_competencia(comp_str):
+    """Converte AAAA-MM (input type=month), AAAA/MM, MM/AAAA ou MM-AAAA no primeiro dia do mês.
+
+    Retorna None se o texto não for uma competência válida ou se o ano estiver fora de ANO_MIN..ANO_MAX.
+    """
+    comp_str = (comp_str or "").strip()
+    for sep in ("-", "/"):
+        if sep in comp_str:
+            parts = comp_str.split(sep)
+            if len(parts) == 2:
+                a, b = parts
+                a, b = a.strip(), b.strip()
+                # Detectar se começa com ano (4 dígitos)
+                if len(a) == 4 and a.isdigit() and b.isdigit():
+                    ano, mes = int(a), int(b)
+                elif len(b) == 4 and a.isdigit() and b.isdigit():
+                    ano, mes = int(b), int(a)
+                else:
+                    continue
+                if not ANO_MIN <= ano <= ANO_MAX:
+                    return None
+                try:
+                    return date(ano, mes, 1)
+                except Exception:
+                    return None
+            break
+    return None
+
+
+def proxima_competencia(comp):
+    """Primeiro dia do mês seguinte (limite superior de intervalos semiabertos)."""
+    if comp.month == 12:
+        return date(comp.year + 1, 1, 1)
+    return date(comp.year, comp.month + 1, 1)
@@ -1,21 +1,25 @@
 from datetime import date
+import hmac
+import io
+import os
 import secrets
-from io import BytesIO
+import tempfile
 
-from django.contrib import messages
-from django.http import FileResponse, Http404, HttpResponse
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.views import redirect_to_login
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.views import View
 from django.views.generic import ListView, CreateView, UpdateView, DetailView
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from django.db import models
-from django.db.models import Q
-import qrcode
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
 
+from . import caixa, condicional, exportar, importar, jobs, metricas, midia, pdf_assets, perfil, relatorios, search
 from .forms import (
     PescadorForm,
     EnderecoForm,
@@ -23,8 +27,14 @@ from .forms import (
     MensalidadePagarForm,
     AssociacaoConfigForm,
     CaixaLancamentoForm,
+    ImportarPescadoresForm,
 )
-from .models import Pescador, Endereco, Documento, Mensalidade, AssociacaoConfig, CaixaLancamento
+from .mensalidades import MAX_COMPETENCIAS_LOTE, RECIBOS_POR_ARQUIVO, gerar_competencias, recibos_lote_queryset
+from .models import (
+    Pescador, Endereco, Documento, Mensalidade, AssociacaoConfig, CaixaLancamento, CaixaResumoMensal,
+    CaixaSaldoMensal, ResumoAnual, Sequencia,
+)
+from .utils import parse_competencia
 
 
 class PescadorListView(ListView):
@@ -33,11 +43,20 @@ class PescadorListView(ListView):
     context_object_name = "pescadores"
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(Q(nome__icontains=q) | Q(cpf__icontains=q) | Q(rgp__icontains=q))
-        return qs
+        # Busca indexada (FTS5/trigram) com paginação por cursor (keyset)
+        pescadores, self.proximo_cursor = search.buscar(
+            super().get_queryset(),
+            q=self.request.GET.get("q"),
+            cursor=self.request.GET.get("cursor"),
+        )
+        return pescadores
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["proximo_cursor"] = self.proximo_cursor
+        ctx["q"] = self.request.GET.get("q", "")
+        ctx["paginado"] = bool(self.request.GET.get("cursor"))
+        return ctx
 
 
 class PescadorCreateView(CreateView):
@@ -64,6 +83,28 @@ class PescadorCreateView(CreateView):
         return response
 
 
+def pescadores_importar(request):
+    form = ImportarPescadoresForm(request.POST or None, request.FILES or None)
+    resultado = None
+    if request.method == "POST" and form.is_valid():
+        bruto, codificacao = form.cleaned_data["arquivo"].file, form.cleaned_data["codificacao"]
+        try:
+            importar.verificar_codificacao(bruto, codificacao)
+            arquivo = io.TextIOWrapper(bruto, encoding=codificacao, newline="")
+            resultado = importar.importar(arquivo, simular=form.cleaned_data["simular"])
+        except UnicodeDecodeError:
+            messages.error(request, "Não foi possível ler o arquivo. Tente a outra codificação.")
+        else:
+            if form.cleaned_data["simular"]:
+                messages.info(request, f"Validação: {resultado.criados} de {resultado.linhas} linha(s) válidas.")
+            elif resultado.criados:
+                messages.success(request, f"{resultado.criados} pescador(es) importado(s).")
+    ctx = {"form": form, "resultado": resultado}
+    if resultado:
+        ctx["erros"] = resultado.erros[:500]
+    return render(request, "associados/pescador_importar.html", ctx)
+
+
 class PescadorUpdateView(UpdateView):
     model = Pescador
     form_class = PescadorForm
@@ -89,25 +130,68 @@ class PescadorUpdateView(UpdateView):
         return response
 
 
-class PescadorDetailView(DetailView):
-    model = Pescador
+class PescadorCondicionalMixin:
+    """GET condicional (ETag/Last-Modified) para páginas que só dependem do pescador."""
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        validadores = condicional.pagina_pescador(request, self.object, AssociacaoConfig.get_cached())
+        if validadores:
+            nao_modificado = validadores.resposta_304(request)
+            if nao_modificado:
+                return nao_modificado
+        response = self.render_to_response(self.get_context_data(object=self.object))
+        if validadores:
+            validadores.aplicar(response)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class PescadorDetailView(PescadorCondicionalMixin, DetailView):
+    """Página do pescador: dados e resumo do Defeso. Documentos e mensalidades vêm em fragmentos
+    carregados ao abrir cada aba (pescador_documentos / pescador_mensalidades)."""
+    queryset = Pescador.objects.select_related("endereco")
     template_name = "associados/pescador_detail.html"
     context_object_name = "pescador"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        ctx["documento_form"] = DocumentoForm()
         # Alerta Defeso: verificar 12 competências pagas no ano corrente
         ano_atual = date.today().year
-        pagos_ano = self.object.mensalidades.filter(
-            competencia__year=ano_atual, status="pago"
-        ).count()
+        resumo = ResumoAnual.objects.filter(pescador=self.object, ano=ano_atual).first()
+        pagos_ano = resumo.pagas if resumo else 0
         ctx["defeso_ano"] = ano_atual
         ctx["defeso_total_pagas"] = pagos_ano
         ctx["defeso_pode"] = pagos_ano >= 12
         return ctx
 
 
+def pescador_documentos(request, pk):
+    pescador = get_object_or_404(Pescador.objects.only("pk"), pk=pk)
+    return render(request, "associados/partials/documentos.html", {
+        "pescador": pescador,
+        "documentos": pescador.documentos.select_related("blob"),
+        "documento_form": DocumentoForm(),
+    })
+
+
+def pescador_mensalidades(request, pk):
+    """Mensalidades de um ano (padrão: o ano corrente, ou o último com mensalidades)."""
+    pescador = get_object_or_404(Pescador.objects.only("pk"), pk=pk)
+    anos = list(pescador.resumos.order_by("-ano").values_list("ano", flat=True))
+    try:
+        ano = int(request.GET.get("ano"))
+        assert relatorios.ANO_MIN <= ano <= relatorios.ANO_MAX
+    except (TypeError, ValueError, AssertionError):
+        ano = date.today().year if date.today().year in anos or not anos else anos[0]
+    mensalidades = Mensalidade.objects.filter(
+        pescador=pescador, competencia__gte=date(ano, 1, 1), competencia__lt=date(ano + 1, 1, 1)
+    ).order_by("-competencia")
+    return render(request, "associados/partials/mensalidades.html", {
+        "pescador": pescador, "anos": anos, "ano": ano, "mensalidades": mensalidades,
+    })
+
+
 class DocumentoCreateView(CreateView):
     model = Documento
     form_class = DocumentoForm
@@ -134,13 +218,17 @@ def mensalidade_pagar(request, pk):
             obj.status = "pago"
             if not obj.data_pagamento:
                 obj.data_pagamento = date.today()
-            # Gerar número sequencial de recibo e token, se não existir
-            if not obj.recibo_numero:
-                last = Mensalidade.objects.exclude(recibo_numero__isnull=True).order_by('-recibo_numero').first()
-                obj.recibo_numero = (last.recibo_numero + 1) if last and last.recibo_numero else 1
-            if not obj.recibo_token:
-                obj.recibo_token = secrets.token_hex(8)
-            obj.save()
+            with transaction.atomic():
+                # Outro caixa pode ter registrado o mesmo pagamento: reaproveita número/token já gravados
+                atual = Mensalidade.objects.select_for_update().only("recibo_numero", "recibo_token").get(pk=obj.pk)
+                obj.recibo_numero = obj.recibo_numero or atual.recibo_numero
+                obj.recibo_token = obj.recibo_token or atual.recibo_token
+                # Gerar número sequencial de recibo e token, se não existir
+                if not obj.recibo_numero:
+                    obj.recibo_numero = Sequencia.proximo("recibo")
+                if not obj.recibo_token:
+                    obj.recibo_token = secrets.token_hex(8)
+                obj.save()
             # Lançar automaticamente receita no Caixa
             try:
                 comp = obj.competencia.strftime('%m/%Y')
@@ -164,27 +252,7 @@ def mensalidade_pagar(request, pk):
 def mensalidade_adicionar(request, pk):
     pescador = get_object_or_404(Pescador, pk=pk)
     if request.method == "POST":
-        comp_str = (request.POST.get("competencia") or "").strip()
-        # Aceita formatos: AAAA-MM (input type=month), AAAA/MM, MM/AAAA, MM-AAAA
-        competencia = None
-        for sep in ("-", "/"):
-            if sep in comp_str:
-                parts = comp_str.split(sep)
-                if len(parts) == 2:
-                    a, b = parts
-                    a, b = a.strip(), b.strip()
-                    # Detectar se começa com ano (4 dígitos)
-                    if len(a) == 4 and a.isdigit() and b.isdigit():
-                        ano, mes = int(a), int(b)
-                    elif len(b) == 4 and a.isdigit() and b.isdigit():
-                        ano, mes = int(b), int(a)
-                    else:
-                        continue
-                    try:
-                        competencia = date(ano, mes, 1)
-                    except Exception:
-                        competencia = None
-                break
+        competencia = parse_competencia(request.POST.get("competencia"))
         if not competencia:
             messages.error(request, "Competência inválida.")
             return redirect("associados:pescador_detail", pk=pescador.pk)
@@ -192,7 +260,7 @@ def mensalidade_adicionar(request, pk):
         obj, created = Mensalidade.objects.get_or_create(
             pescador=pescador,
             competencia=competencia,
-            defaults={"valor": AssociacaoConfig.get_solo().valor_mensalidade_padrao},
+            defaults={"valor": AssociacaoConfig.get_cached().valor_mensalidade_padrao},
         )
         if created:
             messages.success(request, "Mensalidade adicionada.")
@@ -201,136 +269,197 @@ def mensalidade_adicionar(request, pk):
     return redirect("associados:pescador_detail", pk=pescador.pk)
 
 
-def recibo_pdf(request, pk):
-    mensalidade = get_object_or_404(Mensalidade, pk=pk)
-    if mensalidade.status != "pago":
-        raise Http404("Mensalidade não está paga")
+def base_url(request):
+    return request.build_absolute_uri("/").rstrip("/")
 
-    config = AssociacaoConfig.get_solo()
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f"inline; filename=recibo_{mensalidade.id}.pdf"
 
-    def brl(value):
-        try:
-            v = float(value)
-        except Exception:
-            return f"R$ {value}"
-        s = f"{v:,.2f}"
-        return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
-
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-
-    # Área principal (caixa centralizada)
-    box_w = 500
-    box_h = 460
-    box_x = (width - box_w) / 2
-    box_y = height - 80 - box_h
-    p.setLineWidth(1)
-    p.roundRect(box_x, box_y, box_w, box_h, 8)
-
-    # Cabeçalho da associação (centralizado)
-    head_y = box_y + box_h - 30
-    if config.logo:
-        try:
-            img = ImageReader(config.logo.path)
-            img_w, img_h = img.getSize()
-            max_w, max_h = 90, 50
-            ratio = min(max_w / img_w, max_h / img_h)
-            dw, dh = img_w * ratio, img_h * ratio
-            p.drawImage(img, box_x + box_w - dw - 16, head_y - dh + 10, dw, dh, preserveAspectRatio=True, mask='auto')
-        except Exception:
-            pass
-    p.setFont("Helvetica-Bold", 14)
-    assoc = (config.nome or "Associação").upper()
-    tw = p.stringWidth(assoc, "Helvetica-Bold", 14)
-    p.drawString(box_x + (box_w - tw) / 2, head_y, assoc)
-    p.setFont("Helvetica", 9)
-    info1 = f"CNPJ: {config.cnpj or '-'}  |  Tel: {config.telefone or '-'}  |  Email: {config.email or '-'}"
-    tw1 = p.stringWidth(info1, "Helvetica", 9)
-    p.drawString(box_x + (box_w - tw1) / 2, head_y - 14, info1)
-    info2 = f"End.: {config.endereco or '-'} - {config.cidade or ''}/{config.estado or ''} {config.cep or ''}"
-    tw2 = p.stringWidth(info2, "Helvetica", 9)
-    p.drawString(box_x + (box_w - tw2) / 2, head_y - 28, info2)
-
-    # Título do recibo
-    p.setFont("Helvetica-Bold", 16)
-    num_txt = f" Nº {mensalidade.recibo_numero}" if mensalidade.recibo_numero else ""
-    title = f"RECIBO DE PAGAMENTO{num_txt}"
-    twt = p.stringWidth(title, "Helvetica-Bold", 16)
-    p.drawString(box_x + (box_w - twt) / 2, head_y - 56, title)
-
-    # Conteúdo (labels e valores)
-    left = box_x + 24
-    right = box_x + box_w - 24
-    y = head_y - 86
-    label_font = ("Helvetica-Bold", 11)
-    value_font = ("Helvetica", 11)
-
-    def draw_row(label, value):
-        nonlocal y
-        p.setFont(*label_font)
-        p.drawString(left, y, label)
-        p.setFont(*value_font)
-        p.drawString(left + 150, y, value)
-        y -= 20
-
-    comp = mensalidade.competencia.strftime("%m/%Y")
-    draw_row("Recebemos de:", f"{mensalidade.pescador.nome}")
-    draw_row("CPF:", f"{mensalidade.pescador.cpf}")
-    draw_row("RGP:", f"{mensalidade.pescador.rgp}")
-    draw_row("Competência:", comp)
-    draw_row("Valor:", brl(mensalidade.valor))
-    draw_row("Data do pagamento:", mensalidade.data_pagamento.strftime('%d/%m/%Y'))
-    if mensalidade.forma_pagamento:
-        draw_row("Forma de pagamento:", mensalidade.forma_pagamento)
-    if mensalidade.observacao:
-        draw_row("Observações:", mensalidade.observacao)
-
-    # QR Code (canto inferior direito da caixa)
-    verify_url = request.build_absolute_uri(reverse('associados:recibo_pdf', args=[mensalidade.pk]))
-    if mensalidade.recibo_token:
-        verify_url += ("&" if "?" in verify_url else "?") + f"t={mensalidade.recibo_token}"
-    qr = qrcode.QRCode(box_size=2, border=1)
-    qr.add_data(verify_url)
-    qr.make(fit=True)
-    img_qr = qr.make_image(fill_color="black", back_color="white")
-    buf = BytesIO(); img_qr.save(buf, format='PNG'); buf.seek(0)
-    p.drawImage(ImageReader(buf), right - 80, box_y + 24, 64, 64, mask='auto')
-
-    # Assinatura (centralizada)
-    sig_y = box_y + 120
-    line_w = 220
-    cx = box_x + box_w / 2
-    p.line(cx - line_w / 2, sig_y, cx + line_w / 2, sig_y)
-    p.setFont("Helvetica", 10)
-    assinatura = "Assinatura do responsável"
-    if config.presidente:
-        assinatura = f"{config.presidente} - Presidente"
-    tws = p.stringWidth(assinatura, "Helvetica", 10)
-    p.drawString(cx - tws / 2, sig_y - 12, assinatura)
-    if config.assinatura_presidente:
-        try:
-            img_ass = ImageReader(config.assinatura_presidente.path)
-            p.drawImage(img_ass, cx - 60, sig_y + 6, 120, 36, preserveAspectRatio=True, mask='auto')
-        except Exception:
-            pass
-
-    # Linha de autenticidade e data (centralizadas)
-    p.setFont("Helvetica", 9)
-    auth = f"Recibo Nº {mensalidade.recibo_numero or '-'} • Token {mensalidade.recibo_token or '-'}"
-    twa = p.stringWidth(auth, "Helvetica", 9)
-    p.drawString(cx - twa / 2, box_y + 96, auth)
-    emit = f"Emitido em {date.today().strftime('%d/%m/%Y')}"
-    twe = p.stringWidth(emit, "Helvetica", 9)
-    p.drawString(cx - twe / 2, box_y + 82, emit)
-
-    p.showPage()
-    p.save()
+def servir_pdf(request, tipo, obj, filename, validadores):
+    """Entrega o PDF do cache em disco; se ainda não existe, enfileira e mostra a página de espera.
+
+    Com If-None-Match/If-Modified-Since válidos responde 304 sem gerar nem ler o PDF.
+    """
+    nao_modificado = validadores.resposta_304(request)
+    if nao_modificado:
+        return nao_modificado
+    path, job = jobs.obter(tipo, obj, base_url(request))
+    if path:
+        nome = os.path.relpath(path, settings.MEDIA_ROOT)
+        return validadores.aplicar(midia.enviar(nome, content_type="application/pdf", filename=filename))
+    return render(request, "associados/pdf_aguarde.html", {"job": job}, status=202)
+
+
+def metricas_prometheus(request):
+    """Métricas no formato do Prometheus: para a equipe ou com `Authorization: Bearer <METRICAS_TOKEN>`."""
+    token = settings.METRICAS_TOKEN
+    autorizacao = request.headers.get("Authorization", "")
+    if not (token and hmac.compare_digest(autorizacao.encode(), f"Bearer {token}".encode())):
+        if not (request.user.is_active and request.user.is_staff):
+            raise Http404()
+    response = HttpResponse(metricas.prometheus(metricas.ler()), content_type="text/plain; version=0.0.4; charset=utf-8")
+    patch_cache_control(response, no_store=True)
     return response
 
 
-class PescadorFichaView(DetailView):
+@staff_member_required
+def perfis(request):
+    """Capturas de cProfile (?perfil=1) com as funções de maior tempo acumulado."""
+    capturas = perfil.listar()
+    for c in capturas:
+        c["top"] = perfil.funcoes(c["nome"], limite=5)
+    contexto = {**admin.site.each_context(request), "title": "Perfis de requisições", "capturas": capturas}
+    return render(request, "associados/perfis.html", contexto)
+
+
+@staff_member_required
+def perfil_detalhe(request, nome):
+    captura = perfil.carregar(nome)
+    if not captura:
+        raise Http404("Captura não encontrada")
+    contexto = {
+        **admin.site.each_context(request),
+        "title": f"Perfil {captura['url']}",
+        "captura": captura,
+        "acumulado": perfil.funcoes(nome, "cumulative", 60),
+        "proprio": perfil.funcoes(nome, "tottime", 30),
+    }
+    return render(request, "associados/perfil_detalhe.html", contexto)
+
+
+@staff_member_required
+def perfil_download(request, nome):
+    caminho = perfil.arquivo_prof(nome)
+    if not caminho:
+        raise Http404("Captura não encontrada")
+    return FileResponse(open(caminho, "rb"), as_attachment=True, filename=f"{nome}.prof")
+
+
+@staff_member_required
+def midia_protegida(request, caminho):
+    """Documentos em MEDIA_ROOT (blobs/, documentos/): só para a equipe, entregues pelo nginx."""
+    nome = midia.caminho_seguro(caminho)
+    if not nome or not nome.startswith(midia.PROTEGIDOS) or not midia.documento_existe(nome):
+        raise Http404("Arquivo não encontrado")
+    if not os.path.exists(os.path.join(settings.MEDIA_ROOT, nome)):
+        raise Http404("Arquivo não encontrado")
+    # Blobs são endereçados pelo conteúdo: o mesmo nome nunca muda de bytes
+    cache = "private, max-age=31536000, immutable" if nome.startswith("blobs/") else "private, no-cache"
+    return midia.enviar(nome, cache_control=cache)
+
+
+def recibo_verificar(request, numero, token):
+    """Verificação pública do recibo (destino do QR Code): consulta pelo número (índice único)
+    e compara o token em tempo constante. Não gera PDF."""
+    mensalidade = (
+        Mensalidade.objects.select_related("pescador")
+        .only("recibo_numero", "recibo_token", "competencia", "valor", "status", "data_pagamento", "updated_at",
+              "pescador__nome", "pescador__updated_at")
+        .filter(recibo_numero=numero)
+        .first()
+    )
+    # Bytes: compare_digest recusa str com caracteres fora do ASCII (TypeError)
+    if mensalidade and not (
+        mensalidade.recibo_token and hmac.compare_digest(mensalidade.recibo_token.encode(), token.encode())
+    ):
+        mensalidade = None
+    json = request.GET.get("formato") == "json" or "application/json" in request.headers.get("Accept", "")
+    if mensalidade is None:
+        if json:
+            return JsonResponse({"valido": False}, status=404)
+        return render(request, "associados/recibo_verificacao.html", {"config": AssociacaoConfig.get_cached()}, status=404)
+
+    validadores = condicional.Validadores(
+        ["verificacao", json, mensalidade.pk, mensalidade.updated_at, mensalidade.pescador.updated_at],
+        [mensalidade.updated_at, mensalidade.pescador.updated_at],
+    )
+    nao_modificado = validadores.resposta_304(request)
+    if nao_modificado:
+        return nao_modificado
+    if json:
+        response = JsonResponse({
+            "valido": mensalidade.status == "pago",
+            "recibo": mensalidade.recibo_numero,
+            "nome": mensalidade.pescador.nome,
+            "competencia": mensalidade.competencia.strftime("%m/%Y"),
+            "valor": str(mensalidade.valor),
+            "status": mensalidade.status,
+            "data_pagamento": mensalidade.data_pagamento,
+        })
+    else:
+        response = render(request, "associados/recibo_verificacao.html", {
+            "mensalidade": mensalidade, "config": AssociacaoConfig.get_cached(),
+        })
+    patch_cache_control(response, public=True, max_age=300)
+    patch_vary_headers(response, ["Accept"])
+    return validadores.aplicar(response)
+
+
+def recibo_pdf(request, pk):
+    mensalidade = get_object_or_404(Mensalidade.objects.select_related("pescador"), pk=pk)
+    if mensalidade.status != "pago":
+        raise Http404("Mensalidade não está paga")
+    token = request.GET.get("t")
+    if token is not None:
+        # QR Codes antigos apontavam para cá: vão para a verificação, sem gerar o PDF
+        if not (mensalidade.recibo_numero and mensalidade.recibo_token
+                and hmac.compare_digest(mensalidade.recibo_token.encode(), token.encode())):
+            raise Http404("Recibo não encontrado")
+        return redirect("associados:recibo_verificar", numero=mensalidade.recibo_numero, token=token)
+    if not request.user.is_staff:
+        return redirect_to_login(request.get_full_path(), reverse("admin:login"))
+    validadores = condicional.recibo(mensalidade, AssociacaoConfig.get_cached(), base_url(request))
+    return servir_pdf(request, "recibo", mensalidade, f"recibo_{mensalidade.id}.pdf", validadores)
+
+
+@staff_member_required
+def recibos_lote_pdf(request):
+    from . import pdf  # ReportLab/qrcode só no primeiro PDF (ver associados/pdf.py)
+
+    de = parse_competencia(request.GET.get("de"))
+    ate = parse_competencia(request.GET.get("ate")) or de
+    pescador_id = request.GET.get("pescador") or None
+    if not (de or pescador_id):
+        raise Http404("Informe a competência inicial ou o pescador")
+    if pescador_id and not str(pescador_id).isdigit():
+        raise Http404("Pescador inválido")
+    if de and ate < de:
+        raise Http404("Intervalo de competências inválido")
+    por_pagina = 2 if request.GET.get("por_pagina") == "2" else 1
+
+    qs = recibos_lote_queryset(de, ate, pescador_id)
+    total = qs.count()
+    partes = max(1, -(-total // RECIBOS_POR_ARQUIVO))
+    parte = request.GET.get("parte")
+    if parte is None and partes > 1:
+        # Lote grande: uma página com um link por arquivo, cada um gerado em uma requisição curta
+        params = request.GET.copy()
+        links = []
+        for n in range(1, partes + 1):
+            params["parte"] = n
+            inicio = (n - 1) * RECIBOS_POR_ARQUIVO
+            links.append((n, inicio + 1, min(inicio + RECIBOS_POR_ARQUIVO, total), params.urlencode()))
+        return render(request, "associados/recibos_lote.html", {"total": total, "links": links})
+    try:
+        parte = min(max(int(parte or 1), 1), partes)
+    except ValueError:
+        raise Http404("Parte inválida")
+
+    inicio = (parte - 1) * RECIBOS_POR_ARQUIVO
+    config = AssociacaoConfig.get_cached()
+    # O ReportLab guarda as páginas até o save(); o limite por arquivo mantém memória e tempo
+    # da requisição limitados. O PDF pronto vai para um temporário (transborda para disco).
+    out = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+    url = base_url(request)
+    with metricas.medir_pdf("recibos_lote"):
+        pdf.render_recibos(
+            out, qs[inicio:inicio + RECIBOS_POR_ARQUIVO].iterator(chunk_size=500), config,
+            lambda m: pdf.recibo_verify_url(url, m), por_pagina,
+        )
+    out.seek(0)
+    nome = "recibos.pdf" if partes == 1 else f"recibos_parte_{parte}_de_{partes}.pdf"
+    return FileResponse(out, content_type="application/pdf", filename=nome)
+
+
+class PescadorFichaView(PescadorCondicionalMixin, DetailView):
     model = Pescador
     template_name = "associados/pescador_ficha.html"
     context_object_name = "pescador"
@@ -346,17 +475,9 @@ def mensalidades_gerar_ano(request, pk):
         except Exception:
             messages.error(request, "Ano inválido.")
             return redirect("associados:pescador_detail", pk=pescador.pk)
-        cfg = AssociacaoConfig.get_solo()
-        criadas = 0
-        for mes in range(1, 13):
-            comp = date(ano, mes, 1)
-            _, created = Mensalidade.objects.get_or_create(
-                pescador=pescador,
-                competencia=comp,
-                defaults={"valor": cfg.valor_mensalidade_padrao},
-            )
-            if created:
-                criadas += 1
+        criadas = gerar_competencias(
+            date(ano, 1, 1), date(ano, 12, 1), pescadores=Pescador.objects.filter(pk=pescador.pk), desde_associacao=False
+        )["criadas"]
         if criadas:
             messages.success(request, f"{criadas} competências geradas para {ano}.")
         else:
@@ -364,6 +485,48 @@ def mensalidades_gerar_ano(request, pk):
     return redirect("associados:pescador_detail", pk=pescador.pk)
 
 
+def mensalidades_gerar_lote(request):
+    if request.method == "POST":
+        de = parse_competencia(request.POST.get("de"))
+        ate = parse_competencia(request.POST.get("ate")) or de
+        if not de or ate < de:
+            messages.error(request, "Intervalo de competências inválido.")
+            return redirect("associados:relatorios")
+        if (ate.year - de.year) * 12 + ate.month - de.month >= MAX_COMPETENCIAS_LOTE:
+            messages.error(request, f"Gere no máximo {MAX_COMPETENCIAS_LOTE} competências por vez.")
+            return redirect("associados:relatorios")
+        res = gerar_competencias(de, ate)
+        messages.success(
+            request,
+            f"{res['criadas']} mensalidade(s) criada(s) para {res['pescadores']} pescador(es); "
+            f"{res['existentes']} já existiam.",
+        )
+    return redirect("associados:relatorios")
+
+
+class DefesoAptosView(ListView):
+    """Pescadores com as 12 competências do ano pagas (leitura indexada em ResumoAnual)."""
+    template_name = "relatorios/defeso_aptos.html"
+    context_object_name = "resumos"
+    paginate_by = 100
+
+    def get_ano(self):
+        ano, _ = relatorios.filtro_periodo(self.request.GET)
+        return ano or date.today().year
+
+    def get_queryset(self):
+        return (
+            ResumoAnual.objects.filter(ano=self.get_ano(), pagas__gte=12)
+            .select_related("pescador")
+            .order_by("pescador__nome", "pescador_id")
+        )
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["ano"] = self.get_ano()
+        return ctx
+
+
 class RelatoriosView(View):
     template_name = "relatorios/index.html"
 
@@ -371,54 +534,32 @@ class RelatoriosView(View):
         # Filtros por mês/ano
         mes = request.GET.get("mes")
         ano = request.GET.get("ano")
-        m_qs = Mensalidade.objects.all()
-        try:
-            if ano:
-                m_qs = m_qs.filter(competencia__year=int(ano))
-            if mes:
-                m_qs = m_qs.filter(competencia__month=int(mes))
-        except Exception:
-            pass
+        ano_int, mes_int = relatorios.filtro_periodo(request.GET)
+        comparar = bool(request.GET.get("comparar"))
 
+        t = relatorios.totais(ano_int, mes_int, comparar)
         total_associados = Pescador.objects.count()
-        m_pagas_qs = m_qs.filter(status="pago")
-        total_mensalidades_pagas = m_pagas_qs.count()
-        total_mensalidades_pendentes = m_qs.filter(status="pendente").count()
-        # Total recebido (R$) pela soma dos valores pagos no período
-        total_recebido = m_pagas_qs.aggregate(total=models.Sum('valor'))['total'] or 0
-        # Caixa: receitas/despesas/saldo
-        caixa_qs = CaixaLancamento.objects.all()
-        try:
-            if ano:
-                caixa_qs = caixa_qs.filter(data__year=int(ano))
-            if mes:
-                caixa_qs = caixa_qs.filter(data__month=int(mes))
-        except Exception:
-            pass
-        receitas = caixa_qs.filter(tipo='receita').aggregate(total=models.Sum('valor'))['total'] or 0
-        despesas = caixa_qs.filter(tipo='despesa').aggregate(total=models.Sum('valor'))['total'] or 0
-        saldo = (receitas or 0) - (despesas or 0)
         # Devedores: pescadores com alguma mensalidade pendente no período filtrado
-        devedores_ids = m_qs.filter(status="pendente").values_list("pescador_id", flat=True).distinct()
-        devedores = Pescador.objects.filter(id__in=devedores_ids).order_by("nome")
-        try:
-            filtro_mes_int = int(mes) if mes else None
-        except Exception:
-            filtro_mes_int = None
+        pendentes = Mensalidade.objects.filter(
+            relatorios.periodo_q("competencia", ano_int, mes_int), pescador=OuterRef("pk"), status="pendente"
+        )
+        devedores = Pescador.objects.filter(Exists(pendentes)).order_by("nome")
         contexto = {
             "total_associados": total_associados,
-            "total_mensalidades_pagas": total_mensalidades_pagas,
-            "total_mensalidades_pendentes": total_mensalidades_pendentes,
+            "total_mensalidades_pagas": t["pagas"],
+            "total_mensalidades_pendentes": t["pendentes"],
             "devedores": devedores[:50],
             "filtro_mes": mes,
-            "filtro_mes_int": filtro_mes_int,
+            "filtro_mes_int": mes_int,
             "filtro_ano": ano,
-            "config": AssociacaoConfig.get_solo(),
+            "comparar": comparar and ano_int is not None,
+            "config": AssociacaoConfig.get_cached(),
             "months": list(range(1, 13)),
-            "total_recebido": total_recebido,
-            "receitas": receitas,
-            "despesas": despesas,
-            "saldo": saldo,
+            "total_recebido": t["recebido"],
+            "receitas": t["receitas"],
+            "despesas": t["despesas"],
+            "saldo": t["saldo"],
+            "totais": t,
         }
         return render(request, self.template_name, contexto)
 
@@ -429,20 +570,35 @@ class CaixaView(View):
     def get(self, request):
         mes = request.GET.get("mes")
         ano = request.GET.get("ano")
-        lanc_qs = CaixaLancamento.objects.all()
-        try:
-            if ano:
-                lanc_qs = lanc_qs.filter(data__year=int(ano))
-            if mes:
-                lanc_qs = lanc_qs.filter(data__month=int(mes))
-        except Exception:
-            pass
-        receitas = lanc_qs.filter(tipo='receita').aggregate(total=models.Sum('valor'))['total'] or 0
-        despesas = lanc_qs.filter(tipo='despesa').aggregate(total=models.Sum('valor'))['total'] or 0
-        saldo = (receitas or 0) - (despesas or 0)
+        ano_i, mes_i = relatorios.filtro_periodo(request.GET)
+        cursor = request.GET.get("cursor")
+        lancamentos, proximo_cursor = caixa.extrato(
+            CaixaLancamento.objects.filter(relatorios.periodo_q("data", ano_i, mes_i)), cursor=cursor
+        )
+        # Totais e quebra por categoria vêm dos resumos mensais (uma linha por mês/categoria)
+        periodo = relatorios.periodo_q("mes", ano_i, mes_i)
+        tot = CaixaSaldoMensal.objects.filter(periodo).aggregate(
+            receitas=models.Sum("receitas"), despesas=models.Sum("despesas")
+        )
+        receitas = tot["receitas"] or 0
+        despesas = tot["despesas"] or 0
+        saldo = receitas - despesas
+        categorias = (
+            CaixaResumoMensal.objects.filter(periodo)
+            .values("tipo", "categoria")
+            .annotate(total=models.Sum("total"), quantidade=models.Sum("quantidade"))
+            .order_by("tipo", "-total")
+        )
+        if ano_i:
+            fim = date(ano_i, mes_i or 12, 1)
+            saldo_acumulado = CaixaSaldoMensal.saldo_em(fim)
+        else:
+            saldo_acumulado = CaixaSaldoMensal.saldo_em(date.today().replace(day=1))
         form = CaixaLancamentoForm()
         ctx = {
-            "lancamentos": lanc_qs[:200],
+            "lancamentos": lancamentos,
+            "proximo_cursor": proximo_cursor,
+            "paginado": bool(cursor),
             "form": form,
             "months": list(range(1, 13)),
             "filtro_mes": mes,
@@ -450,6 +606,8 @@ class CaixaView(View):
             "receitas": receitas,
             "despesas": despesas,
             "saldo": saldo,
+            "saldo_acumulado": saldo_acumulado,
+            "categorias": categorias,
         }
         return render(request, self.template_name, ctx)
 
@@ -478,6 +636,29 @@ def caixa_excluir(request, pk):
     return redirect("associados:caixa")
 
 
+@staff_member_required
+def exportar_pescadores(request):
+    cabecalho, linhas = exportar.pescadores()
+    return exportar.resposta_csv("pescadores.csv", cabecalho, linhas)
+
+
+@staff_member_required
+def exportar_mensalidades(request):
+    ano, mes = relatorios.filtro_periodo(request.GET)
+    status = request.GET.get("status")
+    if status not in dict(Mensalidade.STATUS_CHOICES):
+        status = None
+    cabecalho, linhas = exportar.mensalidades(ano, mes, status)
+    return exportar.resposta_csv("mensalidades.csv", cabecalho, linhas)
+
+
+@staff_member_required
+def exportar_caixa(request):
+    ano, mes = relatorios.filtro_periodo(request.GET)
+    cabecalho, linhas = exportar.caixa(ano, mes)
+    return exportar.resposta_csv("caixa.csv", cabecalho, linhas)
+
+
 def mensalidade_excluir(request, pk):
     mensalidade = get_object_or_404(Mensalidade, pk=pk)
     pescador_id = mensalidade.pescador.pk
@@ -500,133 +681,20 @@ class AssociacaoConfigUpdateView(UpdateView):
         return AssociacaoConfig.get_solo()
 
     def form_valid(self, form):
+        response = super().form_valid(form)
+        if "logo" in form.changed_data or "assinatura_presidente" in form.changed_data:
+            pdf_assets.preparar(self.object)
         messages.success(self.request, "Dados da associação salvos com sucesso.")
-        return super().form_valid(form)
+        return response
 
 
 # ----------------------
 # Dossiê do Defeso (PDF)
 # ----------------------
 
-REQUIRED_DOCS = [
-    ("RG", "RG"),
-    ("CPF", "CPF"),
-    ("RGP", "RGP"),
-    ("COMPROVANTE_ENDERECO", "Comprovante de Endereço"),
-]
-
-
 def defeso_dossie_pdf(request, pk):
     pescador = get_object_or_404(Pescador, pk=pk)
-    config = AssociacaoConfig.get_solo()
-
-    # Checklist de mensalidades: ano corrente, 12 pagas
-    ano = date.today().year
-    pagas_ano = Mensalidade.objects.filter(pescador=pescador, competencia__year=ano, status="pago").count()
-    mensalidades_ok = pagas_ano >= 12
-
-    # Checklist de documentos obrigatórios
-    docs = pescador.documentos.all()
-    docs_por_tipo = {d.tipo: d for d in docs}
-    docs_check = []
-    for cod, nome in REQUIRED_DOCS:
-        docs_check.append({
-            "codigo": cod,
-            "nome": nome,
-            "ok": cod in docs_por_tipo,
-            "doc": docs_por_tipo.get(cod),
-        })
-    docs_ok = all(item["ok"] for item in docs_check)
-
-    # PDF
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f"inline; filename=dossie_defeso_{pescador.id}.pdf"
-
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-
-    # Capa com logo e associação
-    p.setLineWidth(1)
-    p.rect(40, height - 140, width - 80, 90)
-    if config.logo:
-        try:
-            img = ImageReader(config.logo.path)
-            img_w, img_h = img.getSize()
-            max_w, max_h = 110, 70
-            ratio = min(max_w / img_w, max_h / img_h)
-            dw, dh = img_w * ratio, img_h * ratio
-            p.drawImage(img, width - 60 - dw, height - 60 - dh, dw, dh, preserveAspectRatio=True, mask='auto')
-        except Exception:
-            pass
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(50, height - 70, config.nome or "Associação")
-    p.setFont("Helvetica", 11)
-    p.drawString(50, height - 90, f"Presidente: {config.presidente or '-'}")
-    p.drawString(50, height - 105, f"CNPJ: {config.cnpj or '-'} | Tel: {config.telefone or '-'} | Email: {config.email or '-'}")
-
-    # Título
-    p.setFont("Helvetica-Bold", 18)
-    title = "DOSSIÊ DO SEGURO DEFESO"
-    tw = p.stringWidth(title, "Helvetica-Bold", 18)
-    p.drawString((width - tw) / 2, height - 170, title)
-
-    # Identificação do pescador
-    p.setFont("Helvetica", 12)
-    y = height - 200
-    p.drawString(50, y, f"Pescador: {pescador.nome}")
-    y -= 18
-    p.drawString(50, y, f"CPF: {pescador.cpf}   RGP: {pescador.rgp}")
-    y -= 18
-    p.drawString(50, y, f"Data de Associação: {pescador.data_associacao.strftime('%d/%m/%Y')}")
-
-    # Checklist resumo
-    y -= 28
-    p.setFont("Helvetica-Bold", 13)
-    p.drawString(50, y, "Checklist")
-    y -= 20
-    p.setFont("Helvetica", 12)
-    p.drawString(60, y, f"Mensalidades pagas em {ano}: {pagas_ano}/12 - {'OK' if mensalidades_ok else 'PENDENTE'}")
-    y -= 18
-    p.drawString(60, y, f"Documentos obrigatórios: {'OK' if docs_ok else 'PENDENTE'}")
-
-    # Documentos
-    y -= 28
-    p.setFont("Helvetica-Bold", 13)
-    p.drawString(50, y, "Documentos Obrigatórios")
-    p.setFont("Helvetica", 12)
-    y -= 18
-    for item in docs_check:
-        status = "OK" if item["ok"] else "FALTANDO"
-        txt = f"- {item['nome']}: {status}"
-        if item["ok"] and item["doc"]:
-            txt += f" (enviado em {item['doc'].data_upload.strftime('%d/%m/%Y %H:%M')})"
-        p.drawString(60, y, txt)
-        y -= 16
-        if y < 80:
-            p.showPage(); y = height - 60
-
-    # Mensalidades do ano (sumário)
-    y -= 10
-    p.setFont("Helvetica-Bold", 13)
-    p.drawString(50, y, f"Mensalidades {ano}")
-    y -= 18
-    p.setFont("Helvetica", 12)
-    mens_ano = Mensalidade.objects.filter(pescador=pescador, competencia__year=ano).order_by('competencia')
-    for m in mens_ano:
-        txt = f"- {m.competencia.strftime('%m/%Y')} | {m.get_status_display()} | Valor: R$ {m.valor}"
-        if m.data_pagamento:
-            txt += f" | Pago em {m.data_pagamento.strftime('%d/%m/%Y')}"
-        p.drawString(60, y, txt)
-        y -= 16
-        if y < 80:
-            p.showPage(); y = height - 60
-
-    # Rodapé
-    p.setFont("Helvetica", 9)
-    p.drawRightString(width - 50, 50, f"Emitido em {date.today().strftime('%d/%m/%Y')}")
-
-    p.showPage()
-    p.save()
-    return response
+    validadores = condicional.dossie(pescador, AssociacaoConfig.get_cached(), date.today().year)
+    return servir_pdf(request, "dossie", pescador, f"dossie_defeso_{pescador.id}.pdf", validadores)
 
 # Create your views here.
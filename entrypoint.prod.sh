@@ -6,8 +6,8 @@ set -e
 : "${ALLOWED_HOSTS:=*}"
 : "${CSRF_TRUSTED_ORIGINS:=}"
 
-python manage.py migrate --noinput
-python manage.py collectstatic --noinput
+# migrate/collectstatic só quando migrações ou estáticos mudaram (carimbos no banco e em STATIC_ROOT)
+python manage.py preparar_inicio
 
 # Start Gunicorn
 exec gunicorn spi.wsgi:application \
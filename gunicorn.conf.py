@@ -1,3 +1,6 @@
+import gc
+import os
+
 workers = 3
 worker_class = "sync"
 threads = 2
@@ -7,3 +10,20 @@ max_requests_jitter = 50
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
+
+# preload_app: o master importa o Django (e o renderizador de PDFs) uma vez e os workers nascem
+# por fork, compartilhando essas páginas de memória (copy-on-write). Workers reciclados por
+# max_requests sobem sem reimportar nada. Mudanças de código exigem restart (o HUP não recarrega).
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Carrega no master o que os workers importariam no primeiro PDF; nada aqui abre conexão
+    # com o banco (um socket herdado pelo fork seria compartilhado entre workers).
+    from associados import pdf  # noqa: F401
+
+    # Objetos importados vão para a geração permanente: o GC dos workers não os toca e as
+    # páginas continuam compartilhadas.
+    gc.freeze()
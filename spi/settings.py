@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'associados.inicio.ProntoMiddleware',
+    'associados.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'associados.perfil.PerfilMiddleware',
 ]
 
 ROOT_URLCONF = 'spi.urls'
@@ -94,6 +97,19 @@ if DATABASE_URL:
     DATABASES['default'] = dj_database_url.parse(DATABASE_URL, conn_max_age=600)
 
 
+# Cache
+# "shared" fica em disco e é visto por todos os workers do gunicorn (versões/invalidação)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SHARED_CACHE_DIR', '/tmp/spi-cache'),
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -149,6 +165,31 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# URL pública do sistema (usada em QR Codes gerados fora de uma requisição, ex.: comandos)
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
+# PDFs (recibos/dossiês): com PDF_ASYNC=1 são gerados pelo comando pdf_worker;
+# caso contrário, na própria requisição. Em ambos os casos ficam em cache em MEDIA_ROOT/pdf_cache/
+PDF_ASYNC = os.getenv('PDF_ASYNC', '0') == '1'
+
+# Documentos e PDFs passam por uma view do Django (permissão) e, com MEDIA_X_ACCEL=1,
+# são enviados pelo nginx via X-Accel-Redirect para a location interna MEDIA_X_ACCEL_PREFIX.
+# Sem nginx (desenvolvimento) a própria view responde com FileResponse.
+MEDIA_X_ACCEL = os.getenv('MEDIA_X_ACCEL', '0') == '1'
+MEDIA_X_ACCEL_PREFIX = '/protected/'
+
+# Métricas (latência/SQL por view, geração de PDFs) somadas entre processos em METRICAS_ARQUIVO
+# (gravado a cada METRICAS_FLUSH segundos) e expostas em /metrics para a equipe ou para o
+# Prometheus com `Authorization: Bearer <METRICAS_TOKEN>`.
+METRICAS_ARQUIVO = os.getenv('METRICAS_ARQUIVO', os.path.join(CACHES['shared']['LOCATION'], 'metricas.json'))
+METRICAS_FLUSH = float(os.getenv('METRICAS_FLUSH', '5'))
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+
+# Perfil (cProfile) de uma requisição pedido pela equipe com ?perfil=1 ou `X-Perfil: 1`;
+# guarda as PERFIL_MAX capturas mais recentes em PERFIL_DIR (ver /perfis/).
+PERFIL_DIR = os.getenv('PERFIL_DIR', os.path.join(CACHES['shared']['LOCATION'], 'perfis'))
+PERFIL_MAX = int(os.getenv('PERFIL_MAX', '50'))
+
 # Configuração de valor padrão de mensalidade (pode ser sobrescrito via modelo de configurações)
 DEFAULT_MENSALIDADE = 25.00
 